@@ -5,32 +5,82 @@ This script sends LSP requests and displays the responses.
 """
 
 import json
+import re
+import select
 import subprocess
 import sys
 import os
+import time
 from pathlib import Path
 
-def send_request(proc, request):
-    """Send a JSON-RPC request to the LSP server."""
-    content = json.dumps(request)
-    header = f"Content-Length: {len(content)}\r\n\r\n"
-    message = header + content
-    
-    proc.stdin.write(message.encode())
+CONTENT_LENGTH_RE = re.compile(rb"Content-Length:\s*(\d+)", re.IGNORECASE)
+
+# Bytes read from each server's stdout that have not been framed into a message yet
+_pending = {}
+
+def _take_message(buf):
+    """Remove the first complete message from buf and return its body bytes, or None."""
+    header_end = buf.find(b"\r\n\r\n")
+    if header_end < 0:
+        return None
+    match = CONTENT_LENGTH_RE.search(buf, 0, header_end)
+    length = int(match.group(1)) if match else 0
+    body_start = header_end + 4
+    if len(buf) - body_start < length:
+        return None
+    body = bytes(buf[body_start:body_start + length])
+    del buf[:body_start + length]
+    return body
+
+def read_lsp_message(proc, timeout=None):
+    """Read one Content-Length framed message from the LSP server.
+
+    Raw bytes are accumulated until the header and the full body (counted in
+    bytes, as Content-Length is) are present; the body goes to json.loads
+    undecoded. Returns None on timeout, EOF or an empty body.
+    """
+    buf = _pending.setdefault(proc.pid, bytearray())
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while (body := _take_message(buf)) is None:
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        ready, _, _ = select.select([proc.stdout], [], [], remaining)
+        if not ready:
+            return None
+        chunk = proc.stdout.read(65536)
+        if not chunk:
+            return None
+        buf += chunk
+    return json.loads(body) if body else None
+
+def frame_message(message):
+    """Encode a JSON-RPC message with its Content-Length header."""
+    # Content-Length counts bytes, so measure the encoded body
+    body = json.dumps(message).encode("utf-8")
+    return b"Content-Length: %d\r\n\r\n" % len(body) + body
+
+def send_notifications(proc, *notifications):
+    """Send several notifications back to back in a single write."""
+    proc.stdin.write(b"".join(map(frame_message, notifications)))
+    proc.stdin.flush()
+
+def send_request(proc, request, timeout=2.0):
+    """Send a JSON-RPC message; for requests, wait for the matching response.
+
+    Server notifications (e.g. publishDiagnostics) that arrive first are skipped.
+    """
+    proc.stdin.write(frame_message(request))
     proc.stdin.flush()
     
-    # Read response
-    content_length = 0
-    while True:
-        line = proc.stdout.readline().decode().strip()
-        if line.startswith("Content-Length:"):
-            content_length = int(line.split(":")[1].strip())
-        elif line == "":
-            break
+    if "id" not in request:
+        return None
     
-    if content_length > 0:
-        response = proc.stdout.read(content_length).decode()
-        return json.loads(response)
+    deadline = time.monotonic() + timeout
+    while (remaining := deadline - time.monotonic()) > 0:
+        response = read_lsp_message(proc, remaining)
+        if response is None:
+            break
+        if response.get("id") == request["id"]:
+            return response
     return None
 
 def main():
@@ -46,11 +96,13 @@ def main():
         sys.exit(1)
     
     print(f"Starting LSP server: {lsp_binary}")
+    # Unbuffered stdout so select() never misses data already sitting in a Python buffer
     proc = subprocess.Popen(
         [str(lsp_binary)],
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
+        stderr=subprocess.PIPE,
+        bufsize=0
     )
     
     try:
@@ -68,12 +120,17 @@ def main():
         })
         print(f"Response: {json.dumps(response, indent=2)}")
         
-        # Open document
+        # Open document; `initialized` and didOpen need no reply, so they go
+        # out together in one write
         print(f"\n2. Opening document: {test_file}")
         with open(test_file) as f:
             content = f.read()
         
-        send_request(proc, {
+        send_notifications(proc, {
+            "jsonrpc": "2.0",
+            "method": "initialized",
+            "params": {}
+        }, {
             "jsonrpc": "2.0",
             "method": "textDocument/didOpen",
             "params": {
@@ -86,12 +143,11 @@ def main():
             }
         })
         
-        # Wait a bit for diagnostics
-        import time
-        time.sleep(0.5)
-        
-        # Request diagnostics (they should be pushed automatically)
-        print("\n3. Diagnostics should appear in stderr...")
+        # Diagnostics are pushed after didOpen; take them as soon as they arrive
+        print("\n3. Waiting for published diagnostics...")
+        notification = read_lsp_message(proc, timeout=2.0)
+        if notification and notification.get("method") == "textDocument/publishDiagnostics":
+            print(f"Diagnostics: {len(notification['params']['diagnostics'])} reported")
         
         # Request completion at a position
         print("\n4. Requesting completion after 'my $'...")
@@ -4,20 +4,41 @@
 
 use std::env;
 use std::fs;
+use std::io::{self, BufRead, Write};
 use std::path::Path;
-use std::time::Instant;
+use std::sync::mpsc;
+use std::thread;
+use std::time::{Duration, Instant};
 use walkdir::WalkDir;
 
 // Use the modern perl-parser instead of the legacy tree-sitter-perl
 extern crate perl_parser;
 
-fn process_file(file_path: &Path) -> (bool, u128) {
+/// Parse `file_path` `iterations` times and report the median duration, which
+/// is robust to scheduler and frequency-scaling outliers in single samples.
+///
+/// One untimed warmup parse runs first, so the timed samples see warm page,
+/// instruction-cache and branch-predictor state rather than cold-start costs.
+fn process_file(file_path: &Path, iterations: usize) -> (bool, u128) {
     let code = match fs::read_to_string(file_path) {
         Ok(c) => c,
         Err(_) => return (true, 0),
     };
+    let (mut has_error, _) = parse_once(&code);
+    let mut durations: Vec<u128> = (0..iterations)
+        .map(|_| {
+            let (error, duration) = parse_once(&code);
+            has_error = error;
+            duration
+        })
+        .collect();
+    durations.sort_unstable();
+    (has_error, durations[durations.len() / 2])
+}
+
+fn parse_once(code: &str) -> (bool, u128) {
     let start = Instant::now();
-    let mut parser = perl_parser::Parser::new(&code);
+    let mut parser = perl_parser::Parser::new(code);
     let result = parser.parse();
     let duration = start.elapsed().as_micros();
     match result {
@@ -30,16 +51,117 @@ fn process_file(file_path: &Path) -> (bool, u128) {
     }
 }
 
+/// Per-parse limit, matching the driver's old per-process timeout; the warmup
+/// parse counts too
+const BATCH_FILE_TIMEOUT: Duration = Duration::from_secs(2);
+
+/// Time one file and format its `<path>\tstatus=... duration_us=...` line.
+///
+/// The parse runs on a worker thread so a pathological input is reported as
+/// `status=timeout` instead of stalling the batch or daemon. A timed-out
+/// worker cannot be cancelled, so the returned flag is `true` in that case and
+/// the caller decides whether to keep running alongside it.
+fn time_file_line(file: &str, iterations: usize) -> (String, bool) {
+    let (tx, rx) = mpsc::channel();
+    let owned = file.to_owned();
+    thread::spawn(move || {
+        let _ = tx.send(process_file(Path::new(&owned), iterations));
+    });
+    match rx.recv_timeout(BATCH_FILE_TIMEOUT * (iterations as u32 + 1)) {
+        Ok((has_error, duration)) => (
+            format!("{}\tstatus=success error={} duration_us={}", file, has_error, duration),
+            false,
+        ),
+        Err(_) => (format!("{}\tstatus=timeout", file), true),
+    }
+}
+
+/// Parse every file listed (one path per line) in `list_path`, printing one
+/// result line per file.
+///
+/// After a timeout the remaining files are reported as `status=skipped`
+/// rather than timed, since the runaway parse thread would share the CPU
+/// with them; returning from `main` then stops it.
+fn run_batch(list_path: &Path, iterations: usize) {
+    let list = match fs::read_to_string(list_path) {
+        Ok(list) => list,
+        Err(e) => {
+            eprintln!("Failed to read file list {}: {}", list_path.display(), e);
+            std::process::exit(1);
+        }
+    };
+
+    let mut files = list.lines().filter(|line| !line.is_empty());
+    for file in files.by_ref() {
+        let (result, timed_out) = time_file_line(file, iterations);
+        println!("{}", result);
+        if timed_out {
+            break;
+        }
+    }
+    for file in files {
+        println!("{}\tstatus=skipped", file);
+    }
+}
+
+/// Read file paths from stdin until EOF, answering each with one result line
+/// flushed immediately, so a driver can stream requests to a single process.
+///
+/// After answering `status=timeout` the daemon exits: the runaway parse
+/// thread would otherwise keep burning the (pinned) CPU and skew every later
+/// timing. The driver respawns a fresh daemon for the next file.
+fn run_daemon(iterations: usize) {
+    let stdout = io::stdout();
+    for line in io::stdin().lock().lines() {
+        let Ok(file) = line else { break };
+        if file.is_empty() {
+            continue;
+        }
+        let (result, timed_out) = time_file_line(&file, iterations);
+        let mut out = stdout.lock();
+        // The driver closed its end; nothing left to answer
+        if writeln!(out, "{}", result).and_then(|()| out.flush()).is_err() {
+            break;
+        }
+        if timed_out {
+            // Exiting is the only way to stop the detached parse thread
+            std::process::exit(0);
+        }
+    }
+}
+
 fn main() {
-    let args: Vec<String> = env::args().collect();
+    let mut args: Vec<String> = env::args().collect();
+    let mut iterations = 1;
+    if let Some(pos) = args.iter().position(|arg| arg == "--iterations") {
+        iterations =
+            match args.get(pos + 1).and_then(|n| n.parse::<usize>().ok()).filter(|&n| n > 0) {
+                Some(n) => n,
+                None => {
+                    eprintln!("--iterations requires a positive integer");
+                    std::process::exit(1);
+                }
+            };
+        args.drain(pos..pos + 2);
+    }
+    if args.len() == 3 && args[1] == "--batch" {
+        run_batch(Path::new(&args[2]), iterations);
+        return;
+    }
+    if args.len() == 2 && args[1] == "--daemon" {
+        run_daemon(iterations);
+        return;
+    }
     if args.len() < 2 {
-        eprintln!("Usage: bench_parser <file_or_directory>");
+        eprintln!("Usage: bench_parser [--iterations N] <file_or_directory>");
+        eprintln!("       bench_parser [--iterations N] --batch <file_list>");
+        eprintln!("       bench_parser [--iterations N] --daemon");
         std::process::exit(1);
     }
     let path = Path::new(&args[1]);
 
     if path.is_file() {
-        let (has_error, duration) = process_file(path);
+        let (has_error, duration) = process_file(path, iterations);
         println!("status=success error={} duration_us={}", has_error, duration);
     } else if path.is_dir() {
         let mut total_files = 0;
@@ -51,7 +173,7 @@ fn main() {
             .filter_map(|e| e.ok())
             .filter(|e| e.file_type().is_file())
         {
-            let (has_error, duration) = process_file(entry.path());
+            let (has_error, duration) = process_file(entry.path(), iterations);
             total_files += 1;
             if has_error {
                 error_files += 1;
@@ -0,0 +1,68 @@
+"""
+Numeric kernels for benchmark statistics.
+
+Kernel selection, fastest first:
+  1. the ahead-of-time compiled _stats_aot extension (built by _stats_build.py),
+     which avoids JIT warm-up on every run;
+  2. Numba JIT compilation when Numba is installed;
+  3. the plain Python function, which works on any sorted sequence of floats.
+
+Numba takes hundreds of milliseconds to import, so the compiled kernel is only
+resolved by summary_kernel() the first time a caller has enough data to need it.
+"""
+
+import math
+from importlib.util import find_spec
+
+# Whether a compiled kernel is available, checked without importing Numba
+HAS_NUMBA = find_spec('_stats_aot') is not None or find_spec('numba') is not None
+
+
+def _summary_sorted(sorted_values):
+    """Return (mean, median, sample std, min, max) of a sorted, non-empty sequence.
+
+    Mean and standard deviation come from a single Welford pass; the order
+    statistics are read directly from the sorted input.
+    """
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for x in sorted_values:
+        count += 1
+        delta = x - mean
+        mean += delta / count
+        m2 += delta * (x - mean)
+    std_dev = math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+
+    mid = count // 2
+    if count % 2:
+        median = sorted_values[mid]
+    else:
+        median = (sorted_values[mid - 1] + sorted_values[mid]) / 2.0
+    return mean, median, std_dev, sorted_values[0], sorted_values[count - 1]
+
+
+_summary_kernel = None
+
+
+def summary_kernel():
+    """Return the fastest available summary kernel, compiling it on first use.
+
+    A freshly JIT-compiled kernel is called once on a small array here so the
+    compilation cost is not charged to the first real measurement.
+    """
+    global _summary_kernel
+    if _summary_kernel is None:
+        try:
+            from _stats_aot import summary_sorted
+        except ImportError:
+            try:
+                from numba import njit
+                import numpy as np
+            except ImportError:
+                summary_sorted = _summary_sorted
+            else:
+                summary_sorted = njit(cache=True)(_summary_sorted)
+                summary_sorted(np.array([0.0, 1.0]))
+        _summary_kernel = summary_sorted
+    return _summary_kernel
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Build the ahead-of-time compiled statistics kernel.
+
+Compiles the summary kernel from _stats.py into a _stats_aot extension module next to
+this script, so benchmark comparisons skip Numba's JIT warm-up. Requires Numba.
+
+Usage:
+    python3 scripts/_stats_build.py
+"""
+
+from pathlib import Path
+
+from numba.pycc import CC
+
+from _stats import _summary_sorted
+
+
+def main():
+    cc = CC('_stats_aot')
+    cc.output_dir = str(Path(__file__).parent)
+    cc.export('summary_sorted', 'UniTuple(f8, 5)(f8[:])')(_summary_sorted)
+    cc.compile()
+    print(f"Built _stats_aot in {cc.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,10 +15,11 @@ Usage:
     python3 scripts/debt-report.py --expired    # Show expired quarantines only
 """
 
-import argparse
 import json
 import os
 import sys
+from collections import namedtuple
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
@@ -30,6 +31,52 @@ try:
 except ImportError:
     HAS_YAML = False
 
+# Prefer orjson for --json output; it encodes straight to bytes
+try:
+    import orjson
+
+    def _json_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2, default=asdict).encode()
+
+
+def write_json(obj: Any) -> None:
+    """Write pretty-printed JSON to stdout as bytes."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_json_bytes(obj) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+@dataclass(slots=True)
+class ExpiredQuarantine:
+    """Detail record for a quarantine past its expiry date."""
+
+    name: str | None
+    issue: str | None
+    expired: str
+    days_overdue: int
+
+
+@dataclass(slots=True)
+class ExpiringQuarantine:
+    """Detail record for a quarantine expiring within the next week."""
+
+    name: str | None
+    issue: str | None
+    expires: str
+    days_remaining: int
+
+
+@dataclass(slots=True)
+class CriticalDebt:
+    """Detail record for a critical-priority technical debt item."""
+
+    area: str | None
+    description: str | None
+    issue: str | None
+
 
 def parse_yaml_simple(content: str) -> dict[str, Any]:
     """Simple YAML parser for basic structures (fallback when PyYAML unavailable)."""
@@ -117,20 +164,6 @@ def calculate_expiry(item: dict[str, Any]) -> datetime | None:
     return None
 
 
-def is_expired(item: dict[str, Any], now: datetime) -> bool:
-    """Check if a quarantined item has expired."""
-    expiry = calculate_expiry(item)
-    return expiry is not None and expiry < now
-
-
-def days_until_expiry(item: dict[str, Any], now: datetime) -> int | None:
-    """Get days until expiry (negative if expired)."""
-    expiry = calculate_expiry(item)
-    if expiry is None:
-        return None
-    return (expiry - now).days
-
-
 def count_by_status(items: list[dict[str, Any]], status: str) -> int:
     """Count items with a specific status."""
     return sum(1 for item in items if item.get("status") == status)
@@ -141,7 +174,7 @@ def count_by_priority(items: list[dict[str, Any]], priority: str) -> int:
     return sum(1 for item in items if item.get("priority") == priority)
 
 
-def generate_report(ledger: dict[str, Any], now: datetime) -> dict[str, Any]:
+def generate_report(ledger: dict[str, Any], now: datetime, now_iso: str) -> dict[str, Any]:
     """Generate a comprehensive debt report."""
     budgets = ledger.get("budgets", {})
     flaky_tests = ledger.get("flaky_tests", []) or []
@@ -165,15 +198,23 @@ def generate_report(ledger: dict[str, Any], now: datetime) -> dict[str, Any]:
     issues_pct = (known_issues_count / max_issues * 100) if max_issues > 0 else 0
     debt_pct = (tech_debt_count / max_debt * 100) if max_debt > 0 else 0
 
-    # Find expired quarantines
-    expired_quarantines = [item for item in flaky_tests if is_expired(item, now)]
-    expiring_soon = [
-        item
-        for item in flaky_tests
-        if not is_expired(item, now)
-        and days_until_expiry(item, now) is not None
-        and 0 <= (days_until_expiry(item, now) or 0) <= 7
-    ]
+    # Find expired and soon-to-expire quarantines (one expiry lookup per item)
+    expired_quarantines: list[ExpiredQuarantine] = []
+    expiring_soon: list[ExpiringQuarantine] = []
+    for item in flaky_tests:
+        expiry = calculate_expiry(item)
+        if expiry is None:
+            continue
+        days = (expiry - now).days
+        expiry_str = expiry.strftime("%Y-%m-%d")
+        if expiry < now:
+            expired_quarantines.append(
+                ExpiredQuarantine(item.get("name"), item.get("issue"), expiry_str, -days)
+            )
+        elif 0 <= days <= 7:
+            expiring_soon.append(
+                ExpiringQuarantine(item.get("name"), item.get("issue"), expiry_str, days)
+            )
 
     # Determine status
     def get_status(pct: float) -> str:
@@ -195,7 +236,7 @@ def generate_report(ledger: dict[str, Any], now: datetime) -> dict[str, Any]:
         overall_status = "critical"
 
     return {
-        "timestamp": now.isoformat() + "Z",
+        "timestamp": now_iso,
         "schema_version": ledger.get("schema_version", 1),
         "summary": {
             "overall_status": overall_status,
@@ -234,30 +275,10 @@ def generate_report(ledger: dict[str, Any], now: datetime) -> dict[str, Any]:
         },
         "alerts": [],
         "details": {
-            "expired_quarantines": [
-                {
-                    "name": item.get("name"),
-                    "issue": item.get("issue"),
-                    "expired": calculate_expiry(item).strftime("%Y-%m-%d") if calculate_expiry(item) else None,
-                    "days_overdue": -1 * (days_until_expiry(item, now) or 0),
-                }
-                for item in expired_quarantines
-            ],
-            "expiring_soon": [
-                {
-                    "name": item.get("name"),
-                    "issue": item.get("issue"),
-                    "expires": calculate_expiry(item).strftime("%Y-%m-%d") if calculate_expiry(item) else None,
-                    "days_remaining": days_until_expiry(item, now),
-                }
-                for item in expiring_soon
-            ],
+            "expired_quarantines": expired_quarantines,
+            "expiring_soon": expiring_soon,
             "critical_debt": [
-                {
-                    "area": item.get("area"),
-                    "description": item.get("description"),
-                    "issue": item.get("issue"),
-                }
+                CriticalDebt(item.get("area"), item.get("description"), item.get("issue"))
                 for item in technical_debt
                 if item.get("priority") == "critical"
             ],
@@ -319,22 +340,22 @@ def format_console_report(report: dict[str, Any]) -> str:
         lines.append("")
         lines.append(f"{colors['critical']}Expired Quarantines (action required):{colors['reset']}")
         for item in details["expired_quarantines"]:
-            issue = f" ({item['issue']})" if item.get("issue") else ""
-            lines.append(f"  - {item['name']}{issue}: {item['days_overdue']} days overdue")
+            issue = f" ({item.issue})" if item.issue else ""
+            lines.append(f"  - {item.name}{issue}: {item.days_overdue} days overdue")
 
     if details["expiring_soon"]:
         lines.append("")
         lines.append(f"{colors['warning']}Expiring Soon:{colors['reset']}")
         for item in details["expiring_soon"]:
-            issue = f" ({item['issue']})" if item.get("issue") else ""
-            lines.append(f"  - {item['name']}{issue}: {item['days_remaining']} days remaining")
+            issue = f" ({item.issue})" if item.issue else ""
+            lines.append(f"  - {item.name}{issue}: {item.days_remaining} days remaining")
 
     if details["critical_debt"]:
         lines.append("")
         lines.append(f"{colors['critical']}Critical Technical Debt:{colors['reset']}")
         for item in details["critical_debt"]:
-            issue = f" ({item['issue']})" if item.get("issue") else ""
-            lines.append(f"  - [{item['area']}] {item['description']}{issue}")
+            issue = f" ({item.issue})" if item.issue else ""
+            lines.append(f"  - [{item.area}] {item.description}{issue}")
 
     lines.append("")
     lines.append("=" * 60)
@@ -345,7 +366,23 @@ def format_console_report(report: dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def main():
+# Flag-only invocations (the CI hot path) skip argparse entirely.
+_FastArgs = namedtuple("Args", "check json expired ledger")
+_FAST_FLAGS = frozenset({"--check", "--json", "--expired"})
+
+
+def parse_args(argv: list[str]) -> Any:
+    """Parse command-line arguments, bypassing argparse for plain flag sets."""
+    if all(arg in _FAST_FLAGS for arg in argv):
+        return _FastArgs(
+            check="--check" in argv,
+            json="--json" in argv,
+            expired="--expired" in argv,
+            ledger=None,
+        )
+
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Generate technical debt report from debt ledger"
     )
@@ -371,7 +408,11 @@ def main():
         help="Path to debt ledger (default: .ci/debt-ledger.yaml)",
     )
 
-    args = parser.parse_args()
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
 
     # Find repo root and ledger
     script_dir = Path(__file__).parent
@@ -383,18 +424,19 @@ def main():
 
     # Generate report
     now = datetime.now(timezone.utc).replace(tzinfo=None)
-    report = generate_report(ledger, now)
+    now_iso = f"{now.isoformat()}Z"
+    report = generate_report(ledger, now, now_iso)
 
     # Handle expired-only mode
     if args.expired:
         expired = report["details"]["expired_quarantines"]
         if args.json:
-            print(json.dumps(expired, indent=2))
+            write_json(expired)
         else:
             if expired:
                 print("Expired Quarantines:")
                 for item in expired:
-                    print(f"  - {item['name']}: {item['days_overdue']} days overdue")
+                    print(f"  - {item.name}: {item.days_overdue} days overdue")
                 sys.exit(1)
             else:
                 print("No expired quarantines")
@@ -402,7 +444,7 @@ def main():
 
     # Output format
     if args.json:
-        print(json.dumps(report, indent=2))
+        write_json(report)
     else:
         print(format_console_report(report))
 
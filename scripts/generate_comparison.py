@@ -7,14 +7,216 @@ and generates a comprehensive comparison report with statistical analysis.
 """
 
 import argparse
+import array
+import importlib.util
 import json
-import statistics
 import sys
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
-import math
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
 import os
+import re
+
+# NumPy is optional (see requirements.txt); the pure-Python path is the fallback
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# scipy.stats is slow to import, so it is only loaded for the first confidence interval
+HAS_SCIPY = importlib.util.find_spec('scipy') is not None
+
+from _stats import HAS_NUMBA, summary_kernel
+
+# Test categories and the test-name keywords that select them, in precedence order
+_CATEGORY_KEYWORDS = (
+    ('small_files', 'small'),
+    ('medium_files', 'medium'),
+    ('large_files', 'large'),
+    ('error_recovery', 'error|recovery'),
+    ('memory_usage', 'memory'),
+)
+_CATEGORY_KEYS = tuple(category for category, _ in _CATEGORY_KEYWORDS)
+
+# One named group per category. The alternation is anchored at the start and
+# each branch looks ahead through the whole name, so earlier categories win
+# regardless of where keywords occur; match.lastgroup is the category key.
+_CAT_RE = re.compile(
+    '|'.join(f'(?=.*(?P<{category}>{keywords}))' for category, keywords in _CATEGORY_KEYWORDS),
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _load_json(path: Path) -> Any:
+    """Parse a JSON file read in one binary chunk, using orjson when available.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+    handle both parsers with the same except clause.
+    """
+    data = path.read_bytes()
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert NumPy arrays and scalars left in the comparison to JSON types.
+    
+    orjson serializes float64/int arrays natively; this covers the dtypes it
+    rejects and the stdlib json fallback.
+    """
+    if HAS_NUMPY and isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dump_json(obj: Any, path: str) -> None:
+    """Write obj as indented JSON, serializing with orjson when available."""
+    if HAS_ORJSON:
+        options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, default=_json_default, option=options))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=_json_default)
+
+
+def _as_float_array(values: Sequence[float]) -> 'np.ndarray':
+    """View samples as a contiguous float64 array, copying only when needed.
+    
+    array.array('d') buffers are wrapped without a copy.
+    """
+    if isinstance(values, array.array) and values.typecode == 'd':
+        return np.frombuffer(values, dtype=np.float64)
+    if isinstance(values, np.ndarray):
+        return np.ascontiguousarray(values, dtype=np.float64)
+    return np.fromiter(values, dtype=np.float64, count=len(values))
+
+
+def _use_numpy(values: Sequence[float]) -> bool:
+    """Whether a sample set is large enough (or already an array) for NumPy."""
+    return HAS_NUMPY and (isinstance(values, np.ndarray) or len(values) >= _NUMPY_MIN_SAMPLES)
+
+
+@lru_cache(maxsize=64)
+def _critical_value(confidence: float, df: int) -> float:
+    """Two-sided critical value for a confidence level.
+
+    Student's t with df degrees of freedom when SciPy is installed (correct for
+    small samples), otherwise the standard normal quantile.
+    """
+    quantile = 0.5 + confidence / 2
+    if HAS_SCIPY:
+        from scipy.stats import t as student_t
+        return float(student_t.ppf(quantile, df))
+    from statistics import NormalDist
+    return NormalDist().inv_cdf(quantile)
+
+
+def _timing_fields(result: Dict[str, Any]) -> Tuple[float, float, int]:
+    """Extract (mean_ms, std_dev_ms, iterations) from one benchmark result."""
+    get = result.get
+    return (
+        get('mean_duration_ns', 0) / 1_000_000,
+        get('std_dev_ns', 0) / 1_000_000,
+        get('iterations', 0),
+    )
+
+
+# Test status by bucket number (BenchmarkColumns.status)
+_STATUS_BY_BUCKET = ('improvement', 'within_tolerance', 'regression')
+_EMOJI_BY_BUCKET = ('🟢', '🟡', '🔴')
+_GATE_PASS = "✅ PASS"
+
+# Sample sets smaller than this stay with the statistics module, where building
+# an ndarray costs more than the arithmetic it saves (NumPy arrays are always
+# handled with NumPy)
+_NUMPY_MIN_SAMPLES = 64
+
+# Sample sets at least this large use the compiled summary kernel; below it the
+# Numba import and warm-up outweigh the single fused pass
+_NUMBA_MIN_SAMPLES = 10_000
+
+# Categories are summarized in parallel only when one has at least this many tests
+_PARALLEL_CATEGORY_MIN_TESTS = 1000
+
+# Markdown row for one test: name, C ms, Rust ms, difference %, emoji, status
+_ROW_FORMAT = '| %s | %.3f | %.3f | %+.2f%% | %s %s |\n'
+
+
+@dataclass
+class BenchmarkColumns:
+    """Column-oriented (struct-of-arrays) view of the compared tests.
+    
+    Index i of every column describes the same test. Numeric columns are
+    float64 NumPy arrays when NumPy is installed and lists otherwise; status
+    holds indices into _STATUS_BY_BUCKET once classify() has run.
+    """
+    names: List[str]
+    c_ms: Any
+    rust_ms: Any
+    diff: Any
+    diff_pct: Any
+    speedup: Any
+    status: Any = None
+    
+    @classmethod
+    def from_timings(cls, names: List[str], c_ms: List[float],
+                     rust_ms: List[float]) -> 'BenchmarkColumns':
+        """Compute relative difference and speedup for paired timings.
+        
+        A zero C timing yields a zero difference and a zero Rust timing yields
+        a zero speedup. These do not depend on the thresholds, so a comparison
+        can be reclassified without recomputing them.
+        """
+        if HAS_NUMPY:
+            c = np.asarray(c_ms, dtype=np.float64)
+            rust = np.asarray(rust_ms, dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                diff = np.where(c > 0, (rust - c) / c, 0.0)
+                speedup = np.where(rust > 0, c / rust, 0.0)
+            return cls(names, c, rust, diff, diff * 100, speedup)
+        
+        diff = [(r - c) / c if c > 0 else 0.0 for c, r in zip(c_ms, rust_ms)]
+        speedup = [c / r if r > 0 else 0.0 for c, r in zip(c_ms, rust_ms)]
+        return cls(names, list(c_ms), list(rust_ms), diff, [d * 100 for d in diff], speedup)
+    
+    def classify(self, regression_threshold: float, improvement_threshold: float) -> None:
+        """Assign each test a status bucket; thresholds are fractions (0.05 == 5%)."""
+        if HAS_NUMPY:
+            self.status = np.where(self.diff > regression_threshold, 2,
+                                   (self.diff >= -improvement_threshold)).astype(np.int8)
+        else:
+            self.status = [
+                2 if d > regression_threshold else 0 if d < -improvement_threshold else 1
+                for d in self.diff
+            ]
+    
+    def status_counts(self) -> List[int]:
+        """Number of tests in each status bucket."""
+        if HAS_NUMPY:
+            return np.bincount(self.status, minlength=len(_STATUS_BY_BUCKET)).tolist()
+        counts = [0] * len(_STATUS_BY_BUCKET)
+        for bucket in self.status:
+            counts[bucket] += 1
+        return counts
+    
+    def rows(self):
+        """Iterate (name, diff, diff_pct, speedup, status) per test as Python scalars."""
+        columns = (self.diff, self.diff_pct, self.speedup, self.status)
+        if HAS_NUMPY:
+            columns = tuple(column.tolist() for column in columns)
+        return zip(self.names, *columns)
+
 
 class ComparisonConfig:
     """Configuration for benchmark comparison thresholds and settings."""
@@ -35,8 +237,7 @@ class ComparisonConfig:
     def load_from_file(self, config_path: str) -> None:
         """Load configuration from JSON file."""
         try:
-            with open(config_path, 'r') as f:
-                config_data = json.load(f)
+            config_data = _load_json(Path(config_path))
             
             # Update configuration with loaded values
             for key, value in config_data.items():
@@ -71,49 +272,89 @@ class ComparisonConfig:
             }
         }
         
-        with open(config_path, 'w') as f:
-            json.dump(config_data, f, indent=2)
+        _dump_json(config_data, config_path)
         
         print(f"Default configuration saved to {config_path}")
 
 class BenchmarkComparison:
     """Generate comparison results between C and Rust benchmark data."""
     
-    def __init__(self, c_results_path: str, rust_results_path: str, config: Optional[ComparisonConfig] = None):
-        self.c_results_path = Path(c_results_path)
-        self.rust_results_path = Path(rust_results_path)
+    def __init__(self, c_results: Union[str, Path, Dict[str, Any]],
+                 rust_results: Union[str, Path, Dict[str, Any]],
+                 config: Optional[ComparisonConfig] = None):
+        """Results are JSON file paths, or already parsed result dicts that
+        load_data leaves in place."""
+        self.c_results_path = None if isinstance(c_results, dict) else Path(c_results)
+        self.rust_results_path = None if isinstance(rust_results, dict) else Path(rust_results)
         self.config = config or ComparisonConfig()
-        self.c_data = {}
-        self.rust_data = {}
+        self.c_data = c_results if isinstance(c_results, dict) else {}
+        self.rust_data = rust_results if isinstance(rust_results, dict) else {}
         self.comparison_data = {}
+        self.columns: Optional[BenchmarkColumns] = None
+        # (c_data, rust_data, test_names, c_fields, rust_fields, columns) from the
+        # last comparison, reused while the loaded data objects are unchanged so
+        # threshold-only re-runs just reclassify
+        self._timings: Optional[Tuple] = None
         
     def load_data(self) -> None:
-        """Load benchmark data from both implementations."""
-        try:
-            with open(self.c_results_path, 'r') as f:
-                self.c_data = json.load(f)
-        except FileNotFoundError:
-            print(f"Error: C results file not found: {self.c_results_path}")
-            sys.exit(1)
-        except json.JSONDecodeError as e:
-            print(f"Error: Invalid JSON in C results file: {e}")
-            sys.exit(1)
-            
-        try:
-            with open(self.rust_results_path, 'r') as f:
-                self.rust_data = json.load(f)
-        except FileNotFoundError:
-            print(f"Error: Rust results file not found: {self.rust_results_path}")
-            sys.exit(1)
-        except json.JSONDecodeError as e:
-            print(f"Error: Invalid JSON in Rust results file: {e}")
-            sys.exit(1)
+        """Load benchmark data from both implementations' result files."""
+        if self.c_results_path is None and self.rust_results_path is None:
+            return
+        
+        # The two files are independent; read and parse them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            c_future = self.c_results_path and executor.submit(_load_json, self.c_results_path)
+            rust_future = self.rust_results_path and executor.submit(_load_json, self.rust_results_path)
+        
+        if c_future:
+            try:
+                self.c_data = c_future.result()
+            except FileNotFoundError:
+                print(f"Error: C results file not found: {self.c_results_path}")
+                sys.exit(1)
+            except json.JSONDecodeError as e:
+                print(f"Error: Invalid JSON in C results file: {e}")
+                sys.exit(1)
+        
+        if rust_future:
+            try:
+                self.rust_data = rust_future.result()
+            except FileNotFoundError:
+                print(f"Error: Rust results file not found: {self.rust_results_path}")
+                sys.exit(1)
+            except json.JSONDecodeError as e:
+                print(f"Error: Invalid JSON in Rust results file: {e}")
+                sys.exit(1)
     
-    def calculate_statistics(self, values: List[float]) -> Dict[str, float]:
-        """Calculate statistical measures for a list of values."""
-        if not values:
+    def calculate_statistics(self, values: Sequence[float]) -> Dict[str, float]:
+        """Calculate statistical measures for a sequence of values.
+        
+        Accepts a list, an array.array('d') or a NumPy array; large inputs are
+        reduced with NumPy, reusing array.array and ndarray buffers without a copy.
+        """
+        if len(values) == 0:
             return {}
-            
+        
+        if _use_numpy(values):
+            arr = _as_float_array(values)
+            if HAS_NUMBA and arr.size >= _NUMBA_MIN_SAMPLES:
+                mean, median, std_dev, min_value, max_value = summary_kernel()(np.sort(arr))
+            else:
+                mean = arr.mean()
+                median = np.median(arr)
+                std_dev = arr.std(ddof=1) if arr.size > 1 else 0.0
+                min_value = arr.min()
+                max_value = arr.max()
+            return {
+                'mean': float(mean),
+                'median': float(median),
+                'std_dev': float(std_dev),
+                'min': float(min_value),
+                'max': float(max_value),
+                'count': int(arr.size)
+            }
+        
+        import statistics
         return {
             'mean': statistics.mean(values),
             'median': statistics.median(values),
@@ -123,269 +364,338 @@ class BenchmarkComparison:
             'count': len(values)
         }
     
-    def calculate_confidence_interval(self, values: List[float], confidence: float = 0.95) -> Tuple[float, float]:
-        """Calculate confidence interval for a list of values."""
+    def calculate_confidence_interval(self, values: Sequence[float], confidence: float = 0.95) -> Tuple[float, float]:
+        """Calculate confidence interval for a sequence of values."""
         if len(values) < 2:
-            return (values[0], values[0]) if values else (0.0, 0.0)
+            return (values[0], values[0]) if len(values) else (0.0, 0.0)
             
-        mean = statistics.mean(values)
-        std_err = statistics.stdev(values) / math.sqrt(len(values))
-        
-        # For 95% confidence interval, use 1.96
-        z_score = 1.96 if confidence == 0.95 else 1.645  # 90% confidence
+        import math
+        if _use_numpy(values):
+            arr = _as_float_array(values)
+            mean = float(arr.mean())
+            std_err = float(arr.std(ddof=1)) / math.sqrt(arr.size)
+        else:
+            import statistics
+            mean = statistics.mean(values)
+            std_err = statistics.stdev(values) / math.sqrt(len(values))
         
-        margin = z_score * std_err
+        margin = _critical_value(confidence, len(values) - 1) * std_err
         return (mean - margin, mean + margin)
     
     def compare_implementations(self) -> Dict[str, Any]:
         """Compare C and Rust implementations and generate statistics."""
+        from datetime import datetime
         comparison = {
             'metadata': {
                 'generated_at': datetime.now().isoformat(),
-                'c_results_file': str(self.c_results_path),
-                'rust_results_file': str(self.rust_results_path),
+                'c_results_file': str(self.c_results_path or '<in-memory>'),
+                'rust_results_file': str(self.rust_results_path or '<in-memory>'),
                 'total_tests': 0,
                 'tests_with_regression': 0,
                 'tests_with_improvement': 0,
-                'tests_within_tolerance': 0
+                'tests_within_tolerance': 0,
+                'orphaned_c_only': 0,
+                'orphaned_rust_only': 0
             },
             'summary': {},
             'tests': [],
-            'categories': {
-                'small_files': [],
-                'medium_files': [],
-                'large_files': [],
-                'error_recovery': [],
-                'memory_usage': []
-            }
+            'categories': {key: [] for key in _CATEGORY_KEYS}
         }
         
         # Extract test results from both implementations
         c_tests = self.c_data.get('tests', {})
         rust_tests = self.rust_data.get('tests', {})
         
-        # Find common test names
-        all_test_names = set(c_tests.keys()) | set(rust_tests.keys())
+        # Find tests with results from both implementations, in a stable order
+        # shared by the JSON output and the markdown report
+        test_names = [
+            name for name in sorted(c_tests.keys() & rust_tests.keys())
+            if c_tests[name] and rust_tests[name]
+        ]
         
-        for test_name in all_test_names:
-            c_result = c_tests.get(test_name, {})
-            rust_result = rust_tests.get(test_name, {})
-            
-            if not c_result or not rust_result:
-                continue
-                
-            # Extract timing data
-            c_time = c_result.get('mean_duration_ns', 0) / 1_000_000  # Convert to ms
-            rust_time = rust_result.get('mean_duration_ns', 0) / 1_000_000  # Convert to ms
-            
-            # Calculate difference
-            if c_time > 0:
-                time_diff = (rust_time - c_time) / c_time
-                time_diff_percent = time_diff * 100
-            else:
-                time_diff = 0.0
-                time_diff_percent = 0.0
-            
-            # Determine status using configurable thresholds
-            regression_threshold = self.config.parse_time_regression_threshold / 100.0
-            improvement_threshold = self.config.parse_time_improvement_threshold / 100.0
-            
-            if time_diff > regression_threshold:
-                status = "regression"
-                comparison['metadata']['tests_with_regression'] += 1
-            elif time_diff < -improvement_threshold:
-                status = "improvement"
-                comparison['metadata']['tests_with_improvement'] += 1
-            else:
-                status = "within_tolerance"
-                comparison['metadata']['tests_within_tolerance'] += 1
+        # Record tests that only one implementation ran
+        metadata = comparison['metadata']
+        metadata['orphaned_c_only'] = len(c_tests.keys() - rust_tests.keys())
+        metadata['orphaned_rust_only'] = len(rust_tests.keys() - c_tests.keys())
+        
+        # Nothing to compare (e.g. a mismatched pair of result files)
+        if not test_names:
+            return comparison
+        
+        # Extract timing fields once per result, then compare in one vectorized pass
+        cached = self._timings
+        if cached and cached[0] is self.c_data and cached[1] is self.rust_data:
+            _, _, test_names, c_fields, rust_fields, columns = cached
+        else:
+            c_fields = [_timing_fields(c_tests[name]) for name in test_names]
+            rust_fields = [_timing_fields(rust_tests[name]) for name in test_names]
+            columns = BenchmarkColumns.from_timings(
+                test_names,
+                [mean_ms for mean_ms, _, _ in c_fields],
+                [mean_ms for mean_ms, _, _ in rust_fields],
+            )
+            self._timings = (self.c_data, self.rust_data, test_names, c_fields, rust_fields, columns)
+        columns.classify(
+            self.config.parse_time_regression_threshold / 100.0,
+            self.config.parse_time_improvement_threshold / 100.0,
+        )
+        self.columns = columns
+        
+        metadata['total_tests'] = len(test_names)
+        (metadata['tests_with_improvement'],
+         metadata['tests_within_tolerance'],
+         metadata['tests_with_regression']) = columns.status_counts()
+        
+        # Materialize the per-test records used by the JSON output and the report
+        add_test = comparison['tests'].append
+        categories = comparison['categories']
+        match_category = _CAT_RE.match
+        
+        for (test_name, time_diff, time_diff_percent, speedup, bucket), c_field, rust_field in zip(
+            columns.rows(), c_fields, rust_fields
+        ):
+            c_time, c_std_dev, c_iterations = c_field
+            rust_time, rust_std_dev, rust_iterations = rust_field
             
             test_comparison = {
                 'name': test_name,
                 'c_implementation': {
                     'duration_ms': c_time,
-                    'std_dev_ms': c_result.get('std_dev_ns', 0) / 1_000_000,
-                    'iterations': c_result.get('iterations', 0)
+                    'std_dev_ms': c_std_dev,
+                    'iterations': c_iterations
                 },
                 'rust_implementation': {
                     'duration_ms': rust_time,
-                    'std_dev_ms': rust_result.get('std_dev_ns', 0) / 1_000_000,
-                    'iterations': rust_result.get('iterations', 0)
+                    'std_dev_ms': rust_std_dev,
+                    'iterations': rust_iterations
                 },
                 'comparison': {
                     'time_difference': time_diff,
                     'time_difference_percent': time_diff_percent,
-                    'speedup_factor': c_time / rust_time if rust_time > 0 else 0.0,
-                    'status': status
+                    'speedup_factor': speedup,
+                    'status': _STATUS_BY_BUCKET[bucket],
+                    'status_bucket': bucket
                 }
             }
             
-            comparison['tests'].append(test_comparison)
-            comparison['metadata']['total_tests'] += 1
+            add_test(test_comparison)
             
             # Categorize tests
-            if 'small' in test_name.lower() or test_name.endswith('_small'):
-                comparison['categories']['small_files'].append(test_comparison)
-            elif 'medium' in test_name.lower() or test_name.endswith('_medium'):
-                comparison['categories']['medium_files'].append(test_comparison)
-            elif 'large' in test_name.lower() or test_name.endswith('_large'):
-                comparison['categories']['large_files'].append(test_comparison)
-            elif 'error' in test_name.lower() or 'recovery' in test_name.lower():
-                comparison['categories']['error_recovery'].append(test_comparison)
-            elif 'memory' in test_name.lower():
-                comparison['categories']['memory_usage'].append(test_comparison)
+            m = match_category(test_name)
+            if m:
+                categories[m.lastgroup].append(test_comparison)
         
         # Generate summary statistics
-        comparison['summary'] = self.generate_summary_statistics(comparison)
+        comparison['summary'] = self.generate_summary_statistics(comparison, columns)
         
         return comparison
     
-    def generate_summary_statistics(self, comparison: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate summary statistics for the comparison."""
+    def generate_summary_statistics(self, comparison: Dict[str, Any],
+                                    columns: BenchmarkColumns) -> Dict[str, Any]:
+        """Generate summary statistics for the comparison from its column view."""
         if not comparison['tests']:
             return {}
         
-        # Overall performance
-        time_diffs = [test['comparison']['time_difference_percent'] for test in comparison['tests']]
-        speedups = [test['comparison']['speedup_factor'] for test in comparison['tests']]
-        
         # Categorize by performance impact using configurable thresholds
         regression_threshold = self.config.parse_time_regression_threshold
         improvement_threshold = self.config.parse_time_improvement_threshold
         
-        regressions = [td for td in time_diffs if td > regression_threshold]
-        improvements = [td for td in time_diffs if td < -improvement_threshold]
-        stable = [td for td in time_diffs if -improvement_threshold <= td <= regression_threshold]
+        time_diffs = columns.diff_pct
+        speedups = columns.speedup
         
-        summary = {
-            'overall_performance': {
+        if HAS_NUMPY:
+            diff_arr = time_diffs
+            speedup_arr = speedups
+            overall_performance = {
+                'mean_time_difference_percent': float(diff_arr.mean()),
+                'median_time_difference_percent': float(np.median(diff_arr)),
+                'mean_speedup_factor': float(speedup_arr.mean()),
+                'median_speedup_factor': float(np.median(speedup_arr))
+            }
+            
+            regression_mask = diff_arr > regression_threshold
+            improvement_mask = diff_arr < -improvement_threshold
+            regressions_count = int(regression_mask.sum())
+            improvements_count = int(improvement_mask.sum())
+            regressions_mean = float(diff_arr[regression_mask].mean()) if regressions_count else 0.0
+            improvements_mean = float(diff_arr[improvement_mask].mean()) if improvements_count else 0.0
+        else:
+            import statistics
+            overall_performance = {
                 'mean_time_difference_percent': statistics.mean(time_diffs),
                 'median_time_difference_percent': statistics.median(time_diffs),
                 'mean_speedup_factor': statistics.mean(speedups),
                 'median_speedup_factor': statistics.median(speedups)
-            },
+            }
+            
+            # Single pass over the differences for the regression/improvement split
+            regressions_count = improvements_count = 0
+            regressions_sum = improvements_sum = 0.0
+            for td in time_diffs:
+                if td > regression_threshold:
+                    regressions_count += 1
+                    regressions_sum += td
+                elif td < -improvement_threshold:
+                    improvements_count += 1
+                    improvements_sum += td
+            regressions_mean = regressions_sum / regressions_count if regressions_count else 0.0
+            improvements_mean = improvements_sum / improvements_count if improvements_count else 0.0
+        
+        summary = {
+            'overall_performance': overall_performance,
             'performance_distribution': {
-                'regressions_count': len(regressions),
-                'improvements_count': len(improvements),
-                'stable_count': len(stable),
-                'regressions_mean': statistics.mean(regressions) if regressions else 0.0,
-                'improvements_mean': statistics.mean(improvements) if improvements else 0.0
+                'regressions_count': regressions_count,
+                'improvements_count': improvements_count,
+                'stable_count': len(time_diffs) - regressions_count - improvements_count,
+                'regressions_mean': regressions_mean,
+                'improvements_mean': improvements_mean
             },
             'test_coverage': {
                 'total_tests': comparison['metadata']['total_tests'],
                 'tests_with_regression': comparison['metadata']['tests_with_regression'],
                 'tests_with_improvement': comparison['metadata']['tests_with_improvement'],
                 'tests_within_tolerance': comparison['metadata']['tests_within_tolerance']
-            }
+            },
+            'categories': self.summarize_categories(comparison['categories'])
         }
         
         return summary
     
-    def generate_markdown_report(self, comparison: Dict[str, Any], report_path: str) -> None:
-        """Generate a markdown report from the comparison data."""
-        report_lines = [
-            "# Tree-sitter Perl Benchmark Comparison Report",
-            "",
-            f"**Generated**: {comparison['metadata']['generated_at']}",
-            f"**C Results**: {comparison['metadata']['c_results_file']}",
-            f"**Rust Results**: {comparison['metadata']['rust_results_file']}",
-            "",
-            "## Executive Summary",
-            "",
-            f"- **Total Tests**: {comparison['metadata']['total_tests']}",
-            f"- **Performance Regressions**: {comparison['metadata']['tests_with_regression']}",
-            f"- **Performance Improvements**: {comparison['metadata']['tests_with_improvement']}",
-            f"- **Within Tolerance**: {comparison['metadata']['tests_within_tolerance']}",
-            ""
-        ]
+    def summarize_categories(self, categories: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, float]]:
+        """Calculate statistics for each non-empty category.
         
-        # Overall performance summary
-        if comparison['summary']:
-            summary = comparison['summary']
-            report_lines.extend([
-                "### Overall Performance",
-                "",
-                f"- **Mean Time Difference**: {summary['overall_performance']['mean_time_difference_percent']:.2f}%",
-                f"- **Median Time Difference**: {summary['overall_performance']['median_time_difference_percent']:.2f}%",
-                f"- **Mean Speedup Factor**: {summary['overall_performance']['mean_speedup_factor']:.3f}x",
-                f"- **Median Speedup Factor**: {summary['overall_performance']['median_speedup_factor']:.3f}x",
-                ""
-            ])
-        
-        # Detailed test results
-        report_lines.extend([
-            "## Detailed Test Results",
-            "",
-            "| Test Name | C (ms) | Rust (ms) | Difference | Status |",
-            "|-----------|--------|-----------|------------|---------|"
-        ])
-        
-        for test in comparison['tests']:
-            c_time = test['c_implementation']['duration_ms']
-            rust_time = test['rust_implementation']['duration_ms']
-            diff_percent = test['comparison']['time_difference_percent']
-            status = test['comparison']['status']
-            
-            status_emoji = {
-                'regression': '🔴',
-                'improvement': '🟢',
-                'within_tolerance': '🟡'
-            }.get(status, '⚪')
-            
-            report_lines.append(
-                f"| {test['name']} | {c_time:.3f} | {rust_time:.3f} | {diff_percent:+.2f}% | {status_emoji} {status} |"
-            )
+        Large categories are summarized on worker threads (NumPy sorting releases
+        the GIL); small ones run serially since thread start-up would dominate.
+        """
+        populated = {category: tests for category, tests in categories.items() if tests}
+        if not (HAS_NUMPY and populated
+                and max(map(len, populated.values())) >= _PARALLEL_CATEGORY_MIN_TESTS):
+            return {category: self.calculate_category_statistics(tests)
+                    for category, tests in populated.items()}
+        
+        with ThreadPoolExecutor(max_workers=len(populated)) as executor:
+            futures = {
+                category: executor.submit(self.calculate_category_statistics, tests)
+                for category, tests in populated.items()
+            }
+        return {category: future.result() for category, future in futures.items()}
+    
+    def calculate_category_statistics(self, tests: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Calculate order statistics of time differences (percent) for a category.
         
-        report_lines.extend([
-            "",
-            "## Performance Gates Status",
-            "",
-            "| Gate | Threshold | Status |",
-            "|------|-----------|---------|"
-        ])
+        The values are sorted once; median, quartiles and range are then index reads.
+        """
+        n = len(tests)
+        diffs = (test['comparison']['time_difference_percent'] for test in tests)
+        if HAS_NUMPY:
+            ordered = np.sort(np.fromiter(diffs, dtype=np.float64, count=n)).tolist()
+        else:
+            ordered = sorted(diffs)
+        
+        mid = n // 2
+        return {
+            'count': n,
+            'median': ordered[mid] if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2,
+            'p25': ordered[n // 4],
+            'p75': ordered[3 * n // 4],
+            'min': ordered[0],
+            'max': ordered[-1]
+        }
+    
+    def generate_markdown_report(self, comparison: Dict[str, Any], report_path: str) -> None:
+        """Generate a markdown report from the comparison data.
+        
+        Each section is written to the file as it is produced, so memory use does
+        not grow with the number of tests.
+        """
+        metadata = comparison['metadata']
         
         # Performance gates
-        regression_count = comparison['metadata']['tests_with_regression']
-        total_tests = comparison['metadata']['total_tests']
+        regression_count = metadata['tests_with_regression']
+        total_tests = metadata['total_tests']
         
-        # Performance gates with configurable thresholds
+        # Performance gates with configurable thresholds; each status pair is
+        # indexed by whether the gate passed
+        config = self.config
+        regression_threshold = config.parse_time_regression_threshold
         regression_rate = (regression_count / max(total_tests, 1)) * 100
-        coverage_threshold = self.config.minimum_test_coverage
+        passed = (
+            regression_count == 0,
+            regression_rate <= regression_threshold,
+            total_tests >= 10,
+            total_tests >= 5,
+        )
         
         gates = [
             (
-                "Parse Time Regression", 
-                f"<{self.config.parse_time_regression_threshold}%", 
-                "✅ PASS" if regression_count == 0 else f"❌ FAIL ({regression_count} regressions)"
+                "Parse Time Regression",
+                f"<{regression_threshold}%",
+                (f"❌ FAIL ({regression_count} regressions)", _GATE_PASS)[passed[0]]
             ),
             (
-                "Overall Performance", 
-                f"<{regression_rate:.1f}%", 
-                "✅ PASS" if regression_rate <= self.config.parse_time_regression_threshold else "❌ FAIL"
+                "Overall Performance",
+                f"<{regression_rate:.1f}%",
+                ("❌ FAIL", _GATE_PASS)[passed[1]]
             ),
             (
-                "Test Coverage", 
-                f">{coverage_threshold}%", 
-                "✅ PASS" if total_tests >= 10 else "⚠️ WARNING (insufficient tests)"
+                "Test Coverage",
+                f">{config.minimum_test_coverage}%",
+                ("⚠️ WARNING (insufficient tests)", _GATE_PASS)[passed[2]]
             ),
             (
                 "Statistical Confidence",
-                f"{self.config.confidence_level * 100}%",
-                "✅ PASS" if total_tests >= 5 else "⚠️ WARNING (low sample size)"
+                f"{config.confidence_level * 100}%",
+                ("⚠️ WARNING (low sample size)", _GATE_PASS)[passed[3]]
             )
         ]
         
-        for gate_name, threshold, status in gates:
-            report_lines.append(f"| {gate_name} | {threshold} | {status} |")
-        
-        # Write report
-        with open(report_path, 'w') as f:
-            f.write('\n'.join(report_lines))
+        with open(report_path, 'w', buffering=1 << 20) as f:
+            w = f.write
+            
+            w("# Tree-sitter Perl Benchmark Comparison Report\n\n")
+            w(f"**Generated**: {metadata['generated_at']}\n")
+            w(f"**C Results**: {metadata['c_results_file']}\n")
+            w(f"**Rust Results**: {metadata['rust_results_file']}\n\n")
+            w("## Executive Summary\n\n")
+            w(f"- **Total Tests**: {total_tests}\n")
+            w(f"- **Performance Regressions**: {regression_count}\n")
+            w(f"- **Performance Improvements**: {metadata['tests_with_improvement']}\n")
+            w(f"- **Within Tolerance**: {metadata['tests_within_tolerance']}\n\n")
+            
+            # Overall performance summary
+            if comparison['summary']:
+                overall = comparison['summary']['overall_performance']
+                w("### Overall Performance\n\n")
+                w(f"- **Mean Time Difference**: {overall['mean_time_difference_percent']:.2f}%\n")
+                w(f"- **Median Time Difference**: {overall['median_time_difference_percent']:.2f}%\n")
+                w(f"- **Mean Speedup Factor**: {overall['mean_speedup_factor']:.3f}x\n")
+                w(f"- **Median Speedup Factor**: {overall['median_speedup_factor']:.3f}x\n\n")
+            
+            # Detailed test results
+            w("## Detailed Test Results\n\n")
+            w("| Test Name | C (ms) | Rust (ms) | Difference | Status |\n")
+            w("|-----------|--------|-----------|------------|---------|\n")
+            for test in comparison['tests']:
+                result = test['comparison']
+                bucket = result['status_bucket']
+                w(_ROW_FORMAT % (
+                    test['name'],
+                    test['c_implementation']['duration_ms'],
+                    test['rust_implementation']['duration_ms'],
+                    result['time_difference_percent'],
+                    _EMOJI_BY_BUCKET[bucket],
+                    _STATUS_BY_BUCKET[bucket],
+                ))
+            
+            w("\n## Performance Gates Status\n\n")
+            w("| Gate | Threshold | Status |\n")
+            w("|------|-----------|---------|\n")
+            for gate_name, threshold, status in gates:
+                w(f"| {gate_name} | {threshold} | {status} |\n")
     
     def save_comparison(self, comparison: Dict[str, Any], output_path: str) -> None:
         """Save comparison results to JSON file."""
-        with open(output_path, 'w') as f:
-            json.dump(comparison, f, indent=2)
+        _dump_json(comparison, output_path)
     
     def run(self, output_path: str, report_path: str) -> None:
         """Run the complete comparison process."""
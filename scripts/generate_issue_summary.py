@@ -1,42 +1,63 @@
 #!/usr/bin/env python3
+import io
 import json
-import subprocess
+import sys
 import datetime
 from datetime import timedelta
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# gh pages through results internally (100 per request), so a single call with
+# a generous limit avoids silently truncating large backlogs
+ISSUE_LIMIT = 5000
+
+# Only the fields the report renders; bodies and comments dominate the payload
+ISSUE_FIELDS = "number,title,labels,updatedAt,url"
+
 def get_issues():
+    import subprocess
     cmd = [
         "gh", "issue", "list",
-        "--limit", "500",
+        "--limit", str(ISSUE_LIMIT),
         "--state", "open",
-        "--json", "number,title,labels,updatedAt,comments,url,body"
+        "--json", ISSUE_FIELDS
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = subprocess.run(cmd, capture_output=True)
     if result.returncode != 0:
-        print(f"Error fetching issues: {result.stderr}")
+        print(f"Error fetching issues: {result.stderr.decode(errors='replace')}")
         return []
-    return json.loads(result.stdout)
+    return _json_loads(result.stdout)
 
 def parse_date(date_str):
     # Format: 2025-10-02T12:34:56Z
     return datetime.datetime.fromisoformat(date_str.replace('Z', '+00:00'))
 
-def classify_priority(labels):
-    label_names = [l['name'] for l in labels]
-    if 'priority:critical' in label_names or 'P0' in label_names or 'P0-critical' in label_names:
+_CRITICAL_LABELS = frozenset({'priority:critical', 'p0', 'p0-critical'})
+_HIGH_LABELS = frozenset({'priority:high', 'p1-high'})
+_MEDIUM_LABELS = frozenset({'priority:medium', 'p2-medium'})
+_LOW_LABELS = frozenset({'priority:low', 'p3-low'})
+_TOOLING_LABELS = frozenset({'tooling', 'infrastructure'})
+
+def label_set(labels):
+    """Lowercased label names of an issue, built once and shared by the classifiers."""
+    return frozenset(l['name'].lower() for l in labels)
+
+def classify_priority(label_names):
+    if not label_names.isdisjoint(_CRITICAL_LABELS):
         return 0, "Critical (P0)"
-    if 'priority:high' in label_names or 'P1-high' in label_names:
+    if not label_names.isdisjoint(_HIGH_LABELS):
         return 1, "High (P1)"
-    if 'priority:medium' in label_names or 'P2-medium' in label_names:
+    if not label_names.isdisjoint(_MEDIUM_LABELS):
         return 2, "Medium (P2)"
-    if 'priority:low' in label_names or 'P3-low' in label_names:
+    if not label_names.isdisjoint(_LOW_LABELS):
         return 3, "Low (P3)"
     return 4, "Untagged"
 
-def classify_category(labels, title):
-    label_names = [l['name'].lower() for l in labels]
-    title_lower = title.lower()
-    
+def classify_category(label_names, title_lower):
     if 'dap' in label_names or 'dap' in title_lower:
         return "DAP"
     if 'parser' in label_names or 'parser' in title_lower:
@@ -47,38 +68,44 @@ def classify_category(labels, title):
         return "Testing"
     if 'documentation' in label_names or 'docs' in title_lower:
         return "Documentation"
-    if 'tooling' in label_names or 'infrastructure' in label_names:
+    if not label_names.isdisjoint(_TOOLING_LABELS):
         return "Tooling"
     return "Other"
 
 def generate_report(issues):
     now = datetime.datetime.now(datetime.timezone.utc)
-    stale_threshold = now - timedelta(days=90)
+    stale_threshold_ts = (now - timedelta(days=90)).timestamp()
     
     # Sort and Group
     issues_by_priority = {0: [], 1: [], 2: [], 3: [], 4: []}
     stale_issues = []
     
     for issue in issues:
-        prio_code, _ = classify_priority(issue['labels'])
+        label_names = label_set(issue['labels'])
+        prio_code, _ = classify_priority(label_names)
+        issue['_category'] = classify_category(label_names, issue['title'].lower())
         issues_by_priority[prio_code].append(issue)
         
+        # Parse the update time once; later checks and rendering reuse it
         updated_at = parse_date(issue['updatedAt'])
-        if updated_at < stale_threshold:
+        issue['_updated_ts'] = updated_at.timestamp()
+        issue['_updated_str'] = updated_at.strftime('%Y-%m-%d')
+        if issue['_updated_ts'] < stale_threshold_ts:
             stale_issues.append(issue)
 
     # Markdown Generation
-    lines = []
-    lines.append(f"# GitHub Issues Summary - Perl LSP Repository")
-    lines.append(f"**Generated**: {now.strftime('%Y-%m-%d')}")
-    lines.append(f"**Total Open Issues**: {len(issues)}")
-    lines.append(f"")
-    lines.append(f"---")
-    lines.append(f"")
-    lines.append(f"## 📊 Executive Summary")
-    lines.append(f"")
-    lines.append(f"The repository currently has **{len(issues)} open issues**.")
-    lines.append(f"")
+    out = io.StringIO()
+    w = out.write
+    w(f"# GitHub Issues Summary - Perl LSP Repository\n")
+    w(f"**Generated**: {now.strftime('%Y-%m-%d')}\n")
+    w(f"**Total Open Issues**: {len(issues)}\n")
+    w(f"\n")
+    w(f"---\n")
+    w(f"\n")
+    w(f"## 📊 Executive Summary\n")
+    w(f"\n")
+    w(f"The repository currently has **{len(issues)} open issues**.\n")
+    w(f"\n")
     
     # Priority Sections
     priority_names = {
@@ -94,40 +121,40 @@ def generate_report(issues):
         if not group_issues:
             continue
             
-        lines.append(f"## {priority_names[code]} ({len(group_issues)} issues)")
-        lines.append(f"")
+        w(f"## {priority_names[code]} ({len(group_issues)} issues)\n")
+        w(f"\n")
         
         # Further group by category
         by_cat = {}
         for issue in group_issues:
-            cat = classify_category(issue['labels'], issue['title'])
+            cat = issue['_category']
             if cat not in by_cat:
                 by_cat[cat] = []
             by_cat[cat].append(issue)
             
         for cat in sorted(by_cat.keys()):
-            lines.append(f"### {cat}")
+            w(f"### {cat}\n")
             for issue in by_cat[cat]:
-                updated = parse_date(issue['updatedAt']).strftime('%Y-%m-%d')
+                updated = issue['_updated_str']
                 labels = ", ".join([f"`{l['name']}`" for l in issue['labels']])
-                lines.append(f"#### #{issue['number']}: {issue['title']}")
-                lines.append(f"- **Updated**: {updated}")
+                w(f"#### #{issue['number']}: {issue['title']}\n")
+                w(f"- **Updated**: {updated}\n")
                 if labels:
-                    lines.append(f"- **Labels**: {labels}")
-                lines.append(f"- [View Issue]({issue['url']})")
-                lines.append(f"")
+                    w(f"- **Labels**: {labels}\n")
+                w(f"- [View Issue]({issue['url']})\n")
+                w(f"\n")
     
     # Stale Section
     if stale_issues:
-        lines.append(f"---")
-        lines.append(f"## ⚠️ Stale Issues (>90 days)")
+        w(f"---\n")
+        w(f"## ⚠️ Stale Issues (>90 days)\n")
         for issue in stale_issues:
-            updated = parse_date(issue['updatedAt']).strftime('%Y-%m-%d')
-            lines.append(f"- **#{issue['number']}** {issue['title']} (Last updated: {updated})")
+            updated = issue['_updated_str']
+            w(f"- **#{issue['number']}** {issue['title']} (Last updated: {updated})\n")
             
-    return "\n".join(lines)
+    return out.getvalue()
 
 if __name__ == "__main__":
     issues = get_issues()
     report = generate_report(issues)
-    print(report)
+    sys.stdout.write(report)
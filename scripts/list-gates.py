@@ -1,21 +1,27 @@
 #!/usr/bin/env python3
-import tomllib
+import sys
 from pathlib import Path
 
+BLOCKING = ("🟢 OPTIONAL", "🔴 BLOCKING")
+
 def main():
     gate_toml = Path(".ci/GATE_REGISTRY.toml")
     if not gate_toml.exists():
         print(f"❌ Gate registry not found: {gate_toml}")
         return
 
-    with open(gate_toml, "rb") as f:
+    import tomllib
+
+    # tomllib reads the whole file at once, so skip the buffering layer
+    with open(gate_toml, "rb", buffering=0) as f:
         data = tomllib.load(f)
 
-    print("📋 Registered Gates")
-    print("===================")
-    for gate in data.get("gate", []):
-        blocking = "🔴 BLOCKING" if gate.get("blocking", False) else "🟢 OPTIONAL"
-        print(f"{blocking} {gate['id']:20s} - {gate['name']}")
+    out = ["📋 Registered Gates", "==================="]
+    out.extend(
+        f"{BLOCKING[bool(gate.get('blocking', False))]} {gate['id']:20s} - {gate['name']}"
+        for gate in data.get("gate", [])
+    )
+    sys.stdout.write("\n".join(out) + "\n")
 
 if __name__ == "__main__":
     main()
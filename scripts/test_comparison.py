@@ -5,14 +5,18 @@ Unit tests for the benchmark comparison script.
 Run with: python3 -m pytest test_comparison.py -v
 """
 
+import array
 import json
+import math
 import os
+import statistics
 import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch
 
 # Import modules under test
+import generate_comparison
 from generate_comparison import BenchmarkComparison, ComparisonConfig
 
 
@@ -81,9 +85,10 @@ class TestComparisonConfig(unittest.TestCase):
 class TestBenchmarkComparison(unittest.TestCase):
     """Test the BenchmarkComparison class."""
     
-    def setUp(self):
-        """Set up test data."""
-        self.c_data = {
+    @classmethod
+    def setUpClass(cls):
+        """Set up read-only test data and its result files once per class."""
+        cls.c_data = {
             "tests": {
                 "simple_test": {
                     "mean_duration_ns": 1000000,  # 1ms
@@ -98,7 +103,7 @@ class TestBenchmarkComparison(unittest.TestCase):
             }
         }
         
-        self.rust_data = {
+        cls.rust_data = {
             "tests": {
                 "simple_test": {
                     "mean_duration_ns": 800000,   # 0.8ms (20% faster)
@@ -114,31 +119,29 @@ class TestBenchmarkComparison(unittest.TestCase):
         }
         
         # Create temporary files
-        self.c_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
-        json.dump(self.c_data, self.c_file)
-        self.c_file.close()
-        
-        self.rust_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
-        json.dump(self.rust_data, self.rust_file)
-        self.rust_file.close()
-        
-        # Create comparison instance
-        self.comparison = BenchmarkComparison(
-            self.c_file.name, 
-            self.rust_file.name
-        )
+        cls.result_paths = []
+        for data in (cls.c_data, cls.rust_data):
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+                json.dump(data, f)
+                cls.result_paths.append(f.name)
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Clean up temporary files."""
-        os.unlink(self.c_file.name)
-        os.unlink(self.rust_file.name)
+        for path in cls.result_paths:
+            os.unlink(path)
+    
+    def setUp(self):
+        """Create a comparison instance over the shared in-memory results."""
+        self.comparison = BenchmarkComparison(self.c_data, self.rust_data)
     
-    def test_load_data(self):
+    def test_load_data_from_file(self):
         """Test loading benchmark data from files."""
-        self.comparison.load_data()
+        comparison = BenchmarkComparison(*self.result_paths)
+        comparison.load_data()
         
-        self.assertEqual(self.comparison.c_data, self.c_data)
-        self.assertEqual(self.comparison.rust_data, self.rust_data)
+        self.assertEqual(comparison.c_data, self.c_data)
+        self.assertEqual(comparison.rust_data, self.rust_data)
     
     def test_calculate_statistics(self):
         """Test statistical calculations."""
@@ -152,6 +155,30 @@ class TestBenchmarkComparison(unittest.TestCase):
         self.assertEqual(stats['count'], 5)
         self.assertAlmostEqual(stats['std_dev'], 1.5811, places=3)
     
+    def test_calculate_statistics_large_sample(self):
+        """Test that large sample sets agree with the statistics module."""
+        values = [float((i * 37) % 101) for i in range(20000)]
+        stats = self.comparison.calculate_statistics(values)
+        
+        self.assertEqual(stats['count'], 20000)
+        self.assertAlmostEqual(stats['mean'], sum(values) / 20000)
+        self.assertAlmostEqual(stats['median'], statistics.median(values))
+        self.assertAlmostEqual(stats['std_dev'], statistics.stdev(values))
+        self.assertEqual(stats['min'], min(values))
+        self.assertEqual(stats['max'], max(values))
+    
+    def test_calculate_statistics_array_input(self):
+        """Test statistical calculations on an array.array('d') buffer."""
+        values = array.array('d', [1.0, 2.0, 3.0, 4.0, 5.0])
+        stats = self.comparison.calculate_statistics(values)
+        
+        self.assertEqual(stats, self.comparison.calculate_statistics(list(values)))
+        self.assertEqual(self.comparison.calculate_statistics(array.array('d')), {})
+        
+        low, high = self.comparison.calculate_confidence_interval(values)
+        self.assertLess(low, 3.0)
+        self.assertGreater(high, 3.0)
+    
     def test_calculate_statistics_empty(self):
         """Test statistical calculations with empty data."""
         stats = self.comparison.calculate_statistics([])
@@ -162,10 +189,26 @@ class TestBenchmarkComparison(unittest.TestCase):
         values = [1.0, 2.0, 3.0, 4.0, 5.0]
         ci_low, ci_high = self.comparison.calculate_confidence_interval(values, 0.95)
         
-        # Check that confidence interval is reasonable
+        # Check that confidence interval is centered on the mean
         self.assertLess(ci_low, 3.0)  # Lower than mean
         self.assertGreater(ci_high, 3.0)  # Higher than mean
-        self.assertLess(ci_high - ci_low, 3.0)  # Reasonable width
+        self.assertAlmostEqual(3.0 - ci_low, ci_high - 3.0)
+        
+        # Half-width is the critical value times the standard error sqrt(2.5 / 5);
+        # Student's t (4 degrees of freedom) with SciPy, normal approximation without
+        critical_value = 2.7764 if generate_comparison.HAS_SCIPY else 1.96
+        self.assertAlmostEqual(ci_high - 3.0, critical_value * math.sqrt(0.5), places=3)
+    
+    def test_confidence_interval_widens_with_level(self):
+        """Test that higher confidence levels give wider intervals."""
+        values = [1.0, 2.0, 3.0, 4.0, 5.0]
+        widths = []
+        for level in (0.90, 0.95, 0.99):
+            ci_low, ci_high = self.comparison.calculate_confidence_interval(values, level)
+            widths.append(ci_high - ci_low)
+        
+        self.assertLess(widths[0], widths[1])
+        self.assertLess(widths[1], widths[2])
     
     def test_compare_implementations(self):
         """Test implementation comparison logic."""
@@ -177,6 +220,9 @@ class TestBenchmarkComparison(unittest.TestCase):
         self.assertEqual(comparison['metadata']['tests_with_improvement'], 1)
         self.assertEqual(comparison['metadata']['tests_with_regression'], 1)
         
+        # Tests are reported in sorted order
+        self.assertEqual([test['name'] for test in comparison['tests']], ['complex_test', 'simple_test'])
+        
         # Check test results
         simple_test = None
         complex_test = None
@@ -204,11 +250,7 @@ class TestBenchmarkComparison(unittest.TestCase):
         config.parse_time_regression_threshold = 25.0  # Higher threshold
         config.parse_time_improvement_threshold = 25.0
         
-        comparison_custom = BenchmarkComparison(
-            self.c_file.name,
-            self.rust_file.name,
-            config
-        )
+        comparison_custom = BenchmarkComparison(self.c_data, self.rust_data, config)
         
         comparison_custom.load_data()
         comparison = comparison_custom.compare_implementations()
@@ -217,6 +259,56 @@ class TestBenchmarkComparison(unittest.TestCase):
         for test in comparison['tests']:
             self.assertEqual(test['comparison']['status'], 'within_tolerance')
     
+    def test_reclassify_with_new_thresholds(self):
+        """Test that a threshold change reclassifies without recomputing deltas."""
+        self.comparison.load_data()
+        first = self.comparison.compare_implementations()
+        diffs = self.comparison.columns.diff
+        
+        self.comparison.config.parse_time_regression_threshold = 25.0
+        self.comparison.config.parse_time_improvement_threshold = 25.0
+        second = self.comparison.compare_implementations()
+        
+        self.assertIs(self.comparison.columns.diff, diffs)
+        self.assertNotEqual(first['metadata']['tests_within_tolerance'], 2)
+        self.assertEqual(second['metadata']['tests_within_tolerance'], 2)
+        
+        # Replacing the loaded data invalidates the cached deltas
+        self.comparison.c_data = dict(self.c_data)
+        self.comparison.compare_implementations()
+        self.assertIsNot(self.comparison.columns.diff, diffs)
+    
+    def test_categorize_tests(self):
+        """Test that category keywords keep their precedence order."""
+        result = {"mean_duration_ns": 1000000, "std_dev_ns": 0, "iterations": 1}
+        names = ["Large_memory_small", "memory_error", "parse_large", "plain"]
+        self.comparison.c_data = {"tests": {name: result for name in names}}
+        self.comparison.rust_data = {"tests": {name: result for name in names}}
+        
+        categories = self.comparison.compare_implementations()['categories']
+        
+        def names_in(category):
+            return sorted(test['name'] for test in categories[category])
+        
+        self.assertEqual(names_in('small_files'), ["Large_memory_small"])
+        self.assertEqual(names_in('large_files'), ["parse_large"])
+        self.assertEqual(names_in('error_recovery'), ["memory_error"])
+        self.assertEqual(names_in('memory_usage'), [])
+    
+    def test_compare_disjoint_results(self):
+        """Test comparison of result sets with no common tests."""
+        self.comparison.c_data = {"tests": {"only_c": self.c_data["tests"]["simple_test"]}}
+        self.comparison.rust_data = {"tests": {"only_rust": self.rust_data["tests"]["simple_test"]}}
+        
+        comparison = self.comparison.compare_implementations()
+        
+        self.assertEqual(comparison['metadata']['total_tests'], 0)
+        self.assertEqual(comparison['metadata']['orphaned_c_only'], 1)
+        self.assertEqual(comparison['metadata']['orphaned_rust_only'], 1)
+        self.assertEqual(comparison['tests'], [])
+        self.assertEqual(comparison['summary'], {})
+        self.assertTrue(all(not tests for tests in comparison['categories'].values()))
+    
     def test_generate_summary_statistics(self):
         """Test summary statistics generation."""
         self.comparison.load_data()
@@ -243,6 +335,44 @@ class TestBenchmarkComparison(unittest.TestCase):
         coverage = summary['test_coverage']
         self.assertEqual(coverage['total_tests'], 2)
     
+    def test_calculate_category_statistics(self):
+        """Test per-category order statistics."""
+        tests = [
+            {'comparison': {'time_difference_percent': value}}
+            for value in [4.0, -2.0, 10.0, 0.0]
+        ]
+        stats = self.comparison.calculate_category_statistics(tests)
+        
+        self.assertEqual(stats['count'], 4)
+        self.assertEqual(stats['median'], 2.0)
+        self.assertEqual(stats['min'], -2.0)
+        self.assertEqual(stats['max'], 10.0)
+        self.assertEqual(stats['p25'], 0.0)
+        self.assertEqual(stats['p75'], 10.0)
+    
+    @unittest.skipUnless(generate_comparison.HAS_NUMPY, "requires numpy")
+    def test_save_comparison_numpy_values(self):
+        """Test that NumPy arrays and scalars are written as plain JSON."""
+        np = generate_comparison.np
+        comparison = {
+            'diffs': np.array([1.5, -2.0]),
+            'buckets': np.array([0, 2], dtype=np.int8),
+            'mean': np.float32(0.5),
+        }
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            output_path = f.name
+        
+        try:
+            self.comparison.save_comparison(comparison, output_path)
+            
+            with open(output_path, 'r') as f:
+                saved = json.load(f)
+            
+            self.assertEqual(saved, {'diffs': [1.5, -2.0], 'buckets': [0, 2], 'mean': 0.5})
+        finally:
+            os.unlink(output_path)
+    
     def test_generate_markdown_report(self):
         """Test markdown report generation."""
         self.comparison.load_data()
@@ -5,14 +5,155 @@ Generate PARSER_FEATURE_MATRIX.md from corpus_audit_report.json
 Issue #180: Parser feature baseline infrastructure
 """
 
+from __future__ import annotations
+
+import io
 import json
 import subprocess
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import tomllib
+except ImportError:  # pragma: no cover
+    import tomli as tomllib
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+def _block(*lines: str) -> str:
+    """Join literal lines into one newline-terminated chunk, built once at import."""
+    return "".join(f"{line}\n" for line in lines)
+
+
+# Static sections of the matrix; only the rows between them are formatted per run
+_HEADER = _block(
+    "# Parser Feature Matrix",
+    "",
+    "> **Issue #180**: This document tracks parser coverage and missing features.",
+    "",
+    "## Provenance",
+    "",
+    "| Field | Value |",
+    "|-------|-------|",
+)
+
+_SUMMARY_HEADER = _block(
+    "",
+    "## Summary",
+    "",
+    "| Metric | Current | Target | Status |",
+    "|--------|---------|--------|--------|",
+)
+
+_CATEGORY_HEADER = _block(
+    "",
+    "*Test Corpus Inventory* measures whether the test corpus contains examples of each",
+    "GA (generally available) feature defined in `features.toml`. It does NOT measure",
+    "whether those features parse successfully—that's what Parse Success Rate tracks.",
+    "",
+    "## Error Breakdown by Category",
+    "",
+    "Errors are categorized to help prioritize implementation work:",
+    "",
+    "| Category | Count | Priority | Description |",
+    "|----------|-------|----------|-------------|",
+)
+
+_FAILING_HEADER = _block(
+    "",
+    "## Failing Files",
+    "",
+)
+
+_ROADMAP_HEADER = _block(
+    "",
+    "## Coverage Roadmap",
+    "",
+    "### Phase 1: Stabilize Core (Current)",
+    "- [x] Establish baseline ratchet (Issue #180)",
+    "- [x] Add error categorization",
+)
+
+_FOOTER = _block(
+    "",
+    "### Phase 2: Modern Perl Features",
+    "- [ ] `class` keyword (Perl 5.38+, Corinna)",
+    "- [ ] `try`/`catch`/`finally` blocks",
+    "- [ ] `field` and `method` declarations",
+    "- [ ] `builtin::` functions",
+    "",
+    "### Phase 3: Edge Cases",
+    "- [ ] Complex heredoc scenarios",
+    "- [ ] Unicode in quote delimiters",
+    "- [ ] Recursive regex patterns",
+    "",
+    "## How to Use",
+    "",
+    "```bash",
+    "# View current parse status",
+    "just parser-audit",
+    "",
+    "# Check against baseline (CI mode)",
+    "just ci-parser-features-check",
+    "",
+    "# Update this document from latest audit",
+    "just parser-matrix-update",
+    "```",
+    "",
+    "## Baseline Ratchet",
+    "",
+    "The parse error count uses a ratchet mechanism:",
+    "",
+    "- Baseline stored in `ci/parse_errors_baseline.txt`",
+    "- CI fails if parse errors **increase**",
+    "- CI passes if parse errors stay same or decrease",
+    "- When errors decrease, update baseline: `echo N > ci/parse_errors_baseline.txt`",
+    "",
+    "**Philosophy**: Baseline updates are only allowed when the parser actually improves",
+    "(error count decreases), never to paper over regressions. The ratchet ensures the",
+    "codebase only gets easier to reason about over time.",
+    "",
+    "## Related Documentation",
+    "",
+    "- [CLAUDE.md](../CLAUDE.md) - Project overview and commands",
+    "- [LSP_IMPLEMENTATION_GUIDE.md](LSP_IMPLEMENTATION_GUIDE.md) - LSP server architecture",
+    "- [features.toml](../features.toml) - LSP feature catalog",
+)
+
+
+def _read_git_head(git_dir: Path) -> str | None:
+    """Resolve HEAD to a full SHA by reading the git directory, without spawning git.
+
+    Handles detached HEAD, loose refs and packed-refs; returns None for anything
+    else (e.g. a worktree's `.git` file) so the caller can fall back to git.
+    """
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref: "):
+            return head or None
+        ref = head[len("ref: "):]
+        ref_path = git_dir / ref
+        if ref_path.is_file():
+            return ref_path.read_text().strip() or None
+        for line in (git_dir / "packed-refs").read_text().splitlines():
+            sha, _, name = line.partition(" ")
+            if name == ref:
+                return sha
+    except OSError:
+        pass
+    return None
+
 
 def get_git_sha() -> str:
     """Get current git commit SHA (short form)."""
+    sha = _read_git_head(Path(".git"))
+    if sha:
+        return sha[:7]
     try:
         result = subprocess.run(
             ["git", "rev-parse", "--short", "HEAD"],
@@ -23,20 +164,24 @@ def get_git_sha() -> str:
         return "unknown"
 
 
+def _load_toml(path: Path) -> dict:
+    with path.open("rb") as fh:
+        return tomllib.load(fh)
+
+
 def get_crate_version(crate_name: str) -> str:
-    """Get version from Cargo.toml for a crate."""
+    """Get version from Cargo.toml for a crate.
+
+    Follows `version.workspace = true` to `[workspace.package]` in the root manifest.
+    """
     cargo_path = Path(f"crates/{crate_name}/Cargo.toml")
-    if not cargo_path.exists():
-        return "unknown"
     try:
-        content = cargo_path.read_text()
-        for line in content.split("\n"):
-            if line.startswith("version"):
-                # Extract version from 'version = "x.y.z"'
-                return line.split('"')[1]
-    except (IndexError, IOError):
-        pass
-    return "unknown"
+        version = _load_toml(cargo_path).get("package", {}).get("version", "unknown")
+        if isinstance(version, dict) and version.get("workspace"):
+            version = _load_toml(Path("Cargo.toml")).get("workspace", {}).get("package", {}).get("version", "unknown")
+    except (OSError, tomllib.TOMLDecodeError):
+        return "unknown"
+    return version if isinstance(version, str) else "unknown"
 
 
 def main():
@@ -48,8 +193,8 @@ def main():
         print(f"Error: {report_path} not found. Run 'just parser-audit' first.")
         return 1
 
-    with open(report_path) as f:
-        report = json.load(f)
+    # Read in one chunk and decode from bytes; orjson handles large failing_files lists far faster
+    report = _json_loads(report_path.read_bytes())
 
     # Read baseline if it exists
     baseline = None
@@ -71,52 +216,31 @@ def main():
     # Get provenance info
     git_sha = get_git_sha()
     parser_version = get_crate_version("perl-parser")
-    generated_at = report.get("metadata", {}).get("generated_at", datetime.now().isoformat())
+    generated_at = datetime.now().strftime("%Y-%m-%d %H:%M")
     corpus_path = "test_corpus/"  # Default, could be extracted from report metadata
 
     # Generate markdown
-    lines = [
-        "# Parser Feature Matrix",
-        "",
-        "> **Issue #180**: This document tracks parser coverage and missing features.",
-        "",
-        "## Provenance",
-        "",
-        "| Field | Value |",
-        "|-------|-------|",
-        f"| Generated | {datetime.now().strftime('%Y-%m-%d %H:%M')} |",
-        f"| Commit | `{git_sha}` |",
-        f"| perl-parser | v{parser_version} |",
-        f"| Corpus | `{corpus_path}` |",
-        f"| Command | `just parser-audit && just parser-matrix-update` |",
-        "",
-        "## Summary",
-        "",
-        "| Metric | Current | Target | Status |",
-        "|--------|---------|--------|--------|",
-        f"| Parse Success Rate | {success_rate:.0f}% ({ok}/{total} files) | 100% | {'Passing' if errors == 0 else 'In Progress'} |",
-        f"| Parse Errors | {errors} | 0 | {'Passing' if errors == 0 else 'Baseline Set'} |",
-        f"| Timeouts | {timeouts} | 0 | {'Passing' if timeouts == 0 else 'Failed'} |",
-        f"| Panics | {panics} | 0 | {'Passing' if panics == 0 else 'Failed'} |",
-        f"| Test Corpus Inventory | {ga_coverage:.0f}% | 100% | {'Passing' if ga_coverage >= 80 else 'In Progress'} |",
-    ]
+    out = io.StringIO()
+    emit = out.write
+
+    emit(_HEADER)
+    emit(f"| Generated | {generated_at} |\n")
+    emit(f"| Commit | `{git_sha}` |\n")
+    emit(f"| perl-parser | v{parser_version} |\n")
+    emit(f"| Corpus | `{corpus_path}` |\n")
+    emit("| Command | `just parser-audit && just parser-matrix-update` |\n")
+
+    emit(_SUMMARY_HEADER)
+    emit(f"| Parse Success Rate | {success_rate:.0f}% ({ok}/{total} files) | 100% | {'Passing' if errors == 0 else 'In Progress'} |\n")
+    emit(f"| Parse Errors | {errors} | 0 | {'Passing' if errors == 0 else 'Baseline Set'} |\n")
+    emit(f"| Timeouts | {timeouts} | 0 | {'Passing' if timeouts == 0 else 'Failed'} |\n")
+    emit(f"| Panics | {panics} | 0 | {'Passing' if panics == 0 else 'Failed'} |\n")
+    emit(f"| Test Corpus Inventory | {ga_coverage:.0f}% | 100% | {'Passing' if ga_coverage >= 80 else 'In Progress'} |\n")
 
     if baseline is not None:
-        lines.append(f"| Baseline | {baseline} | 0 | Ratcheted |")
-
-    lines.extend([
-        "",
-        "*Test Corpus Inventory* measures whether the test corpus contains examples of each",
-        "GA (generally available) feature defined in `features.toml`. It does NOT measure",
-        "whether those features parse successfully—that's what Parse Success Rate tracks.",
-        "",
-        "## Error Breakdown by Category",
-        "",
-        "Errors are categorized to help prioritize implementation work:",
-        "",
-        "| Category | Count | Priority | Description |",
-        "|----------|-------|----------|-------------|",
-    ])
+        emit(f"| Baseline | {baseline} | 0 | Ratcheted |\n")
+
+    emit(_CATEGORY_HEADER)
 
     # Full taxonomy - show all categories even if count is 0
     category_taxonomy = {
@@ -135,13 +259,9 @@ def main():
 
     for category, count in sorted_categories:
         priority, desc = category_taxonomy[category]
-        lines.append(f"| {category} | {count} | {priority} | {desc} |")
+        emit(f"| {category} | {count} | {priority} | {desc} |\n")
 
-    lines.extend([
-        "",
-        "## Failing Files",
-        "",
-    ])
+    emit(_FAILING_HEADER)
 
     if failing_files:
         for f in failing_files:
@@ -169,80 +289,22 @@ def main():
             # Code snippet
             snippet = f.get("code_snippet", "")
 
-            # Build the entry
-            lines.append(f"### `{path}`")
-            lines.append("")
-            lines.append(f"- **Category**: {category}")
-            if location:
-                lines.append(f"- **Location**: {location}")
-            if token_info:
-                lines.append(f"- **Error**: {token_info}")
-
-            if snippet:
-                lines.append("")
-                lines.append("```perl")
-                lines.append(snippet)
-                lines.append("```")
-
-            lines.append("")
+            # Build the entry as one string; optional parts collapse to ""
+            location_line = f"- **Location**: {location}\n" if location else ""
+            error_line = f"- **Error**: {token_info}\n" if token_info else ""
+            snippet_block = f"\n```perl\n{snippet}\n```\n" if snippet else ""
+            emit(
+                f"### `{path}`\n\n- **Category**: {category}\n"
+                f"{location_line}{error_line}{snippet_block}\n"
+            )
     else:
-        lines.append("*No failing files* ✅")
-
-    lines.extend([
-        "",
-        "## Coverage Roadmap",
-        "",
-        "### Phase 1: Stabilize Core (Current)",
-        "- [x] Establish baseline ratchet (Issue #180)",
-        "- [x] Add error categorization",
-        f"- {'[x]' if errors == 0 else '[ ]'} Reduce parse errors to 0",
-        "",
-        "### Phase 2: Modern Perl Features",
-        "- [ ] `class` keyword (Perl 5.38+, Corinna)",
-        "- [ ] `try`/`catch`/`finally` blocks",
-        "- [ ] `field` and `method` declarations",
-        "- [ ] `builtin::` functions",
-        "",
-        "### Phase 3: Edge Cases",
-        "- [ ] Complex heredoc scenarios",
-        "- [ ] Unicode in quote delimiters",
-        "- [ ] Recursive regex patterns",
-        "",
-        "## How to Use",
-        "",
-        "```bash",
-        "# View current parse status",
-        "just parser-audit",
-        "",
-        "# Check against baseline (CI mode)",
-        "just ci-parser-features-check",
-        "",
-        "# Update this document from latest audit",
-        "just parser-matrix-update",
-        "```",
-        "",
-        "## Baseline Ratchet",
-        "",
-        "The parse error count uses a ratchet mechanism:",
-        "",
-        "- Baseline stored in `ci/parse_errors_baseline.txt`",
-        "- CI fails if parse errors **increase**",
-        "- CI passes if parse errors stay same or decrease",
-        "- When errors decrease, update baseline: `echo N > ci/parse_errors_baseline.txt`",
-        "",
-        "**Philosophy**: Baseline updates are only allowed when the parser actually improves",
-        "(error count decreases), never to paper over regressions. The ratchet ensures the",
-        "codebase only gets easier to reason about over time.",
-        "",
-        "## Related Documentation",
-        "",
-        "- [CLAUDE.md](../CLAUDE.md) - Project overview and commands",
-        "- [LSP_IMPLEMENTATION_GUIDE.md](LSP_IMPLEMENTATION_GUIDE.md) - LSP server architecture",
-        "- [features.toml](../features.toml) - LSP feature catalog",
-    ])
-
-    with open(output_path, "w") as f:
-        f.write("\n".join(lines) + "\n")
+        emit("*No failing files* ✅\n")
+
+    emit(_ROADMAP_HEADER)
+    emit(f"- {'[x]' if errors == 0 else '[ ]'} Reduce parse errors to 0\n")
+    emit(_FOOTER)
+
+    output_path.write_text(out.getvalue())
 
     print(f"Updated {output_path}")
     print(f"  Parse success: {ok}/{total} ({success_rate:.0f}%)")
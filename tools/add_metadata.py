@@ -2,12 +2,21 @@
 """
 Add basic metadata to existing corpus files that don't have it.
 """
+import functools
+import io
+import os
 import re
 import pathlib
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 ROOT = pathlib.Path(__file__).resolve().parents[1] / "test" / "corpus"
 SEC_RE = re.compile(r"^=+\s*$")
 META_RE = re.compile(r"^#\s*@(id|tags|perl|flags):")
+PERL_LINE = "# @perl: 5.8+\n"
 
 # Tag mappings based on file names and content
 FILE_TAG_MAP = {
@@ -22,12 +31,68 @@ FILE_TAG_MAP = {
     "fuzz-tripwires.txt": ["tripwire", "regex-code", "qw", "indirect"]
 }
 
+# Base tag sets, frozen once so every section of a file seeds from the same set
+_BASE_CACHE = {name: frozenset(tags) for name, tags in FILE_TAG_MAP.items()}
+_NO_TAGS = frozenset()
+
+# Title keywords (matched as substrings of the lowercased title) and the
+# tags they add
+TITLE_TRIGGERS = {
+    "math": ("arithmetic",),
+    "string": ("string",),
+    "list": ("list",),
+    "array": ("list",),
+    "hash": ("hash",),
+    "file": ("file-test",),
+    "magic": ("punctuation-var",),
+    "special": ("punctuation-var",),
+    "error": ("error",),
+    "time": ("localtime", "gmtime"),
+    "regex": ("regex",),
+    "match": ("regex",),
+    "pod": ("comment",),
+}
+
+if ahocorasick is not None:
+    _TRIGGER_AUTOMATON = ahocorasick.Automaton()
+    for _keyword, _tags in TITLE_TRIGGERS.items():
+        _TRIGGER_AUTOMATON.add_word(_keyword, _tags)
+    _TRIGGER_AUTOMATON.make_automaton()
+
+    def title_tags(title_lower):
+        """Return every tag triggered by a keyword in the lowercased title."""
+        tags = set()
+        for _, triggered in _TRIGGER_AUTOMATON.iter(title_lower):
+            tags.update(triggered)
+        return tags
+else:
+    # Zero-width lookahead so overlapping keywords (e.g. "mathash") all match
+    _TRIGGER_RE = re.compile(
+        "(?=(" + "|".join(map(re.escape, TITLE_TRIGGERS)) + "))"
+    )
+
+    def title_tags(title_lower):
+        """Return every tag triggered by a keyword in the lowercased title."""
+        tags = set()
+        for keyword in _TRIGGER_RE.findall(title_lower):
+            tags.update(TITLE_TRIGGERS[keyword])
+        return tags
+
+@functools.lru_cache(maxsize=None)
+def _emit_tags(tags):
+    """Render a frozenset of tags as the complete, sorted `# @tags:` line."""
+    return f"# @tags: {' '.join(sorted(tags))}\n"
+
 def add_metadata_to_file(filepath):
     """Add metadata to sections that don't have it."""
-    with filepath.open("r", encoding="utf-8") as f:
-        lines = f.readlines()
+    original = filepath.read_bytes()
+    # StringIO(newline=None) splits exactly like a text-mode readlines()
+    lines = io.StringIO(original.decode("utf-8"), newline=None).readlines()
     
-    base_tags = FILE_TAG_MAP.get(filepath.name, [])
+    base_tags = _BASE_CACHE.get(filepath.name, _NO_TAGS)
+    # Per-file pieces of the generated metadata, built once
+    file_base = filepath.stem.replace("-", "_").replace(".", "_")
+    id_prefix = f"# @id: {file_base}."
     modified = False
     new_lines = []
     i = 0
@@ -54,45 +119,17 @@ def add_metadata_to_file(filepath):
                 i += 1
             
             # Check if metadata already exists
-            has_metadata = False
-            if i < len(lines) and lines[i].startswith("#") and "@" in lines[i]:
-                has_metadata = True
+            has_metadata = i < len(lines) and META_RE.match(lines[i]) is not None
             
             if not has_metadata:
-                # Generate ID
-                file_base = filepath.stem.replace("-", "_").replace(".", "_")
-                id_str = f"{file_base}.{section_count:03d}"
-                
                 # Generate tags based on title
                 title_lower = title.lower()
-                tags = list(base_tags)
-                
-                # Add specific tags based on content
-                if "math" in title_lower:
-                    tags.append("arithmetic")
-                if "string" in title_lower:
-                    tags.append("string")
-                if "list" in title_lower or "array" in title_lower:
-                    tags.append("list")
-                if "hash" in title_lower:
-                    tags.append("hash")
-                if "file" in title_lower:
-                    tags.append("file-test")
-                if "magic" in title_lower or "special" in title_lower:
-                    tags.append("punctuation-var")
-                if "error" in title_lower:
-                    tags.append("error")
-                if "time" in title_lower:
-                    tags.extend(["localtime", "gmtime"])
-                if "regex" in title_lower or "match" in title_lower:
-                    tags.append("regex")
-                if "pod" in title_lower:
-                    tags.append("comment")
+                tags = base_tags | title_tags(title_lower)
                 
                 # Add metadata
-                new_lines.append(f"# @id: {id_str}\n")
-                new_lines.append(f"# @tags: {' '.join(sorted(set(tags)))}\n")
-                new_lines.append("# @perl: 5.8+\n")
+                new_lines.append(f"{id_prefix}{section_count:03d}\n")
+                new_lines.append(_emit_tags(tags))
+                new_lines.append(PERL_LINE)
                 
                 # Add flags if needed
                 if "error" in title_lower:
@@ -111,12 +148,17 @@ def add_metadata_to_file(filepath):
             new_lines.append(lines[i])
             i += 1
     
-    if modified:
-        # Write back
-        with filepath.open("w", encoding="utf-8") as f:
-            f.writelines(new_lines)
-        return True
-    return False
+    if not modified:
+        return False
+    new_bytes = "".join(new_lines).encode("utf-8")
+    if new_bytes == original:
+        return False
+    # Write back in one call via a sibling temp file, so a crash never
+    # leaves a half-written corpus file
+    tmp = filepath.with_suffix(filepath.suffix + ".tmp")
+    tmp.write_bytes(new_bytes)
+    os.replace(tmp, filepath)
+    return True
 
 def main():
     """Add metadata to all corpus files."""
@@ -0,0 +1,146 @@
+"""
+Shared section scanner for the tree-sitter-perl test corpus tools.
+"""
+import functools
+import os
+import pathlib
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Parsed sections shared between runs of corpus_lint.py and corpus_index.py,
+# stored next to the corpus files. Hidden, because `tree-sitter test` reads
+# every non-hidden file in the corpus directory as a test file
+CACHE_NAME = ".corpus_cache.pkl"
+
+# Below this many files the process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+
+@functools.lru_cache(maxsize=None)
+def known_tags():
+    """Known valid tags, read once from tags.txt next to this module."""
+    path = pathlib.Path(__file__).with_name("tags.txt")
+    return frozenset(
+        line for line in map(str.strip, path.read_text(encoding="utf-8").splitlines())
+        if line and not line.startswith("#")
+    )
+
+
+# One combined pattern matches a whole section header: the opening
+# delimiter, the title line, the optional closing delimiter and the run of
+# '#' comment lines that carries the metadata. finditer() then skips each
+# section body in C until the next delimiter line.
+_SCAN = re.compile(
+    r"(?m)^=+[^\S\n]*(?:\n|\Z)"
+    r"(?:(?!\Z)(?P<title>.*)\n?)?"
+    r"(?:=+[^\S\n]*(?:\n|\Z))?"
+    r"(?P<meta>(?:#.*(?:\n|\Z))*)"
+)
+_META = re.compile(r"(?m)^#[^\S\n]*@(?P<k>id|tags|perl|flags):(?P<v>.*)$")
+
+
+def parse_sections(text):
+    """Yield one dict per section in a corpus file's text.
+
+    ``title`` is None when the file ends right after a delimiter.
+    ``body_start`` is the 1-indexed line of the first body line and
+    ``body_end`` the 1-indexed line of the last one.
+    """
+    line = 0
+    pos = 0
+    prev = None
+    for m in _SCAN.finditer(text):
+        line += text.count("\n", pos, m.start())
+        pos = m.start()
+        if prev is not None:
+            prev["body_end"] = line
+            yield prev
+        title = m.group("title")
+        meta = {mm.group("k"): mm.group("v").strip()
+                for mm in _META.finditer(m.group("meta"))}
+        prev = {
+            "title": None if title is None else title.strip(),
+            "meta": meta,
+            "body_start": line + _lines(text, pos, m.end()) + 1,
+        }
+    if prev is not None:
+        prev["body_end"] = line + _lines(text, pos, len(text))
+        yield prev
+
+
+def _lines(text, start, end):
+    """Count the lines in text[start:end], including an unterminated last one."""
+    n = text.count("\n", start, end)
+    if end == len(text) and end > start and not text.endswith("\n"):
+        n += 1
+    return n
+
+
+def map_files(fn, files):
+    """Apply fn to each corpus file, in parallel for large corpora.
+
+    Results come back in the order of ``files``. fn must be a module-level
+    function so it can be pickled.
+    """
+    if len(files) < PARALLEL_MIN_FILES:
+        return [fn(f) for f in files]
+    with ProcessPoolExecutor() as ex:
+        return list(ex.map(fn, files, chunksize=4))
+
+
+def read_sections(filepath):
+    """Parse one corpus file into (sections, ends_with_newline)."""
+    text = filepath.read_text(encoding="utf-8")
+    return list(parse_sections(text)), not text or text.endswith("\n")
+
+
+def _parser_key():
+    """Cache generation: the scanner's own stat, so editing it drops the cache."""
+    st = pathlib.Path(__file__).stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def parse_corpus(root, files):
+    """Return read_sections() for each file, reusing unchanged entries from the cache.
+
+    Entries are keyed by (st_mtime_ns, st_size); only changed files are
+    re-parsed (through map_files), and the cache is rewritten when anything
+    was re-parsed or dropped. The cache is best effort: an unwritable corpus
+    directory just means nothing is reused next time.
+    """
+    cache_path = root / CACHE_NAME
+    parser_key = _parser_key()
+    try:
+        cached_key, entries = pickle.loads(cache_path.read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        cached_key, entries = None, {}
+    if cached_key != parser_key:
+        entries = {}
+    
+    keys = []
+    results = []
+    misses = []
+    for i, f in enumerate(files):
+        st = f.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        keys.append(key)
+        entry = entries.get(f.name)
+        if entry is not None and entry[0] == key:
+            results.append(entry[1])
+        else:
+            results.append(None)
+            misses.append(i)
+    
+    for i, parsed in zip(misses, map_files(read_sections, [files[i] for i in misses])):
+        results[i] = parsed
+    
+    if misses or len(entries) != len(files):
+        entries = {f.name: (key, parsed) for f, key, parsed in zip(files, keys, results)}
+        tmp = cache_path.with_suffix(cache_path.suffix + ".tmp")
+        try:
+            tmp.write_bytes(pickle.dumps((parser_key, entries), protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return results
@@ -2,69 +2,64 @@
 """
 Generate index and coverage reports for the tree-sitter-perl test corpus.
 """
-import re
+import argparse
+import io
 import json
+import os
 import sys
 import pathlib
 import collections
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from corpus_common import parse_corpus, read_sections
+
 ROOT = pathlib.Path(__file__).resolve().parents[1] / "test" / "corpus"
-SEC_RE = re.compile(r"^=+\s*$")
-META_RE = re.compile(r"^#\s*@(?P<k>id|tags|perl|flags):\s*(?P<v>.*)$")
 
-def parse_file(filepath):
-    """Parse a corpus file and extract sections with metadata."""
-    with filepath.open("r", encoding="utf-8") as fh:
-        lines = fh.readlines()
-    
+def parse_file(filepath, parsed=None):
+    """Extract sections with metadata; parsed is the file's read_sections() result, if known."""
     sections = []
-    i = 0
-    while i < len(lines):
-        if SEC_RE.match(lines[i]):
-            # Found section delimiter
-            title = lines[i+1].strip() if i+1 < len(lines) else ""
-            
-            # Skip second delimiter
-            if i+2 < len(lines) and SEC_RE.match(lines[i+2]):
-                i += 3
-            else:
-                i += 2
-            
-            # Extract metadata
-            meta = {}
-            while i < len(lines) and lines[i].startswith("#"):
-                m = META_RE.match(lines[i].rstrip())
-                if m:
-                    meta[m.group("k")] = m.group("v").strip()
-                i += 1
-            
-            # Find body start
-            body_start = i
-            
-            # Find next section or EOF
-            while i < len(lines) and not SEC_RE.match(lines[i]):
-                i += 1
-            
-            sections.append({
-                "file": filepath.name,
-                "title": title,
-                "meta": meta,
-                "body_start": body_start + 1,  # 1-indexed for humans
-                "body_end": i
-            })
-        else:
-            i += 1
+    for section in (parsed or read_sections(filepath))[0]:
+        entry = {"file": filepath.name, **section}
+        if entry["title"] is None:
+            entry["title"] = ""
+        sections.append(entry)
     
     return sections
 
+def _dumps(obj, pretty=False, sort_keys=False):
+    """Serialize to UTF-8 JSON bytes: compact by default, 2-space indented if pretty."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys).encode("utf-8")
+
+def _atomic_write(path, content):
+    """Write via a sibling temp file and rename, so readers never see a torn file."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--pretty", action="store_true",
+                        help="indent _index.json and _tags.json for humans")
+    args = parser.parse_args()
+    
     # Find all .txt files in corpus
     files = sorted(f for f in ROOT.glob("*.txt") 
                    if not f.name.startswith("_"))
     
     all_sections = []
-    for f in files:
-        all_sections.extend(parse_file(f))
+    for filepath, parsed in zip(files, parse_corpus(ROOT, files)):
+        all_sections.extend(parse_file(filepath, parsed))
     
     # Validate and normalize
     ids = []
@@ -108,8 +103,7 @@ def main():
     
     # Write index.json
     index_path = ROOT / "_index.json"
-    with index_path.open("w", encoding="utf-8") as f:
-        json.dump(index, f, indent=2)
+    _atomic_write(index_path, _dumps(index, pretty=args.pretty))
     print(f"✓ Generated {index_path}")
     
     # Generate tags map
@@ -120,56 +114,54 @@ def main():
     
     # Write tags.json
     tags_path = ROOT / "_tags.json"
-    with tags_path.open("w", encoding="utf-8") as f:
-        json.dump(dict(tag_map), f, indent=2, sort_keys=True)
+    _atomic_write(tags_path, _dumps(dict(tag_map), pretty=args.pretty, sort_keys=True))
     print(f"✓ Generated {tags_path}")
     
-    # Generate coverage summary
-    summary = []
-    summary.append("# Tree-sitter Perl Corpus Coverage Summary")
-    summary.append("")
-    summary.append(f"**Total files:** {len(files)}")
-    summary.append(f"**Total test cases:** {len(all_sections)}")
-    summary.append("")
+    # Tally files, tags, flags and Perl versions in one pass
+    file_counts = collections.Counter()
+    tag_counts = collections.Counter()
+    flag_counts = collections.Counter()
+    perl_versions = collections.Counter()
+    for s in index:
+        file_counts[s["file"]] += 1
+        tag_counts.update(s["tags"])
+        flag_counts.update(s["flags"])
+        if s["perl"]:
+            perl_versions[s["perl"]] += 1
+    
+    # Generate coverage summary; each section opens with the blank line
+    # that separates it from the one before
+    buf = io.StringIO()
+    w = buf.write
+    w("# Tree-sitter Perl Corpus Coverage Summary\n\n")
+    w(f"**Total files:** {len(files)}\n")
+    w(f"**Total test cases:** {len(all_sections)}\n")
     
     # By file
-    summary.append("## Test cases by file")
-    summary.append("")
-    file_counts = collections.Counter(s["file"] for s in index)
+    w("\n## Test cases by file\n\n")
     for fname, count in sorted(file_counts.items()):
-        summary.append(f"- `{fname}`: {count} tests")
-    summary.append("")
+        w(f"- `{fname}`: {count} tests\n")
     
     # By tag
-    summary.append("## Test cases by tag")
-    summary.append("")
-    tag_counts = collections.Counter(tag for s in index for tag in s["tags"])
+    w("\n## Test cases by tag\n\n")
     for tag, count in sorted(tag_counts.items(), key=lambda x: (-x[1], x[0])):
-        summary.append(f"- **{tag}**: {count}")
-    summary.append("")
+        w(f"- **{tag}**: {count}\n")
     
     # By flag
-    flag_counts = collections.Counter(flag for s in index for flag in s["flags"])
     if flag_counts:
-        summary.append("## Test cases by flag")
-        summary.append("")
+        w("\n## Test cases by flag\n\n")
         for flag, count in sorted(flag_counts.items()):
-            summary.append(f"- **{flag}**: {count}")
-        summary.append("")
+            w(f"- **{flag}**: {count}\n")
     
     # By Perl version
-    perl_versions = collections.Counter(s["perl"] for s in index if s["perl"])
     if perl_versions:
-        summary.append("## Test cases by Perl version requirement")
-        summary.append("")
+        w("\n## Test cases by Perl version requirement\n\n")
         for version, count in sorted(perl_versions.items()):
-            summary.append(f"- **{version}**: {count}")
-        summary.append("")
+            w(f"- **{version}**: {count}\n")
     
     # Write summary
     summary_path = ROOT / "COVERAGE_SUMMARY.md"
-    with summary_path.open("w", encoding="utf-8") as f:
-        f.write("\n".join(summary))
+    summary_path.write_text(buf.getvalue(), encoding="utf-8")
     print(f"✓ Generated {summary_path}")
     
     print(f"\nCorpus statistics:")
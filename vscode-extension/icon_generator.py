@@ -1,12 +1,21 @@
 #!/usr/bin/env python3
-"""Generate a PNG icon for the VSCode extension"""
+"""Generate a PNG icon for the VSCode extension
+
+By default this writes the prebuilt base64 PNG, and does nothing at all when
+icon.png already exists. Set REGEN_ICON=1 to rewrite it, or REGEN_ICON=pil to
+render it with Pillow (falls back to the base64 icon if Pillow is missing).
+"""
 
 import os
+import sys
 
 # Create a simple PNG icon using Python
 # This creates a 128x128 icon with a stylized "P" for Perl
 
-try:
+REGEN_ICON = os.environ.get("REGEN_ICON")
+
+
+def render_with_pil():
     from PIL import Image, ImageDraw, ImageFont
     
     # Create a new image with a dark blue background
@@ -54,10 +63,9 @@ try:
     # Save the image
     img.save('icon.png')
     print("Icon generated: icon.png")
-    
-except ImportError:
-    print("PIL/Pillow not installed. Creating a simple icon using base64...")
-    
+
+
+def write_base64_icon():
     # Fallback: Create a minimal PNG using base64 encoded data
     import base64
     
@@ -92,4 +100,18 @@ except ImportError:
     
     with open('icon.png', 'wb') as f:
         f.write(png_data)
-    print("Basic icon.png created")
\ No newline at end of file
+    print("Basic icon.png created")
+
+
+if os.path.exists('icon.png') and not REGEN_ICON:
+    print("icon.png already exists (set REGEN_ICON=1 or REGEN_ICON=pil to regenerate)")
+    sys.exit(0)
+
+if REGEN_ICON == "pil":
+    try:
+        render_with_pil()
+    except ImportError:
+        print("PIL/Pillow not installed. Creating a simple icon using base64...")
+        write_base64_icon()
+else:
+    write_base64_icon()